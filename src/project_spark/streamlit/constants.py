@@ -3,7 +3,9 @@ Constants and configuration for the Streamlit Campaign Data Processor.
 Centralized location for all constants to avoid magic numbers and duplicate definitions.
 """
 
-from typing import List
+import functools
+import os
+from typing import FrozenSet, List
 
 # ============================================================================
 # FILE UPLOAD CONFIGURATION
@@ -23,6 +25,17 @@ MIN_WAVE_NUMBER: int = 1
 MIN_PROJECT_YEAR: int = 2000
 MAX_PROJECT_YEAR: int = 2090
 
+# Buffer size for streaming uploaded files to disk
+COPY_CHUNK_SIZE_BYTES: int = 1024 * 1024
+
+# Campaign files at least this large are read and preprocessed in chunks to bound memory
+CHUNKED_READ_MIN_SIZE_MB: int = 10
+# Rows per chunk; CSV_CHUNK_SIZE in the process environment overrides the default
+CSV_CHUNK_SIZE: int = int(os.getenv('CSV_CHUNK_SIZE', '50000'))
+
+# Rows per staged Parquet file for Snowflake MERGE uploads; SNOWFLAKE_BATCH_SIZE overrides it
+SNOWFLAKE_BATCH_SIZE: int = int(os.getenv('SNOWFLAKE_BATCH_SIZE', '50000'))
+
 # ============================================================================
 # SCHEMA CONFIGURATION
 # ============================================================================
@@ -40,129 +53,45 @@ BASE_TABLE_NAMES = [
 ]
 
 # ============================================================================
-# EXPECTED CAMPAIGN DATA COLUMNS
+# CRITICAL COLUMNS (Must be present)
 # ============================================================================
 
-EXPECTED_CAMPAIGN_COLUMNS: List[str] = [
-    # Campaign & Ad Info
-    'campaign_name',
-    'ad_name',
-    'ad_set_name',
-    'ad_delivery',
-    'starts',
-    'ends',
-    'reporting_starts',
-    'reporting_ends',
-    'last_significant_edit',
-    'wave_number',
-    'attribution_setting',
-
-    # Budget & Spend
-    'amount_spent_usd',
-    'ad_set_budget',
-    'ad_set_budget_type',
-    'bid',
-    'bid_type',
-    'cpm_usd',
-
-    # Core Performance Metrics
-    'results',
-    'result_indicator',
-    'cost_per_result',
-    'frequency',
-    'reach',
-    'impressions',
-    'unique_link_clicks',
-    'landing_page_views',
-    'email_signups',
-
-    # Essential KPIs
-    'kpv_community',
-    'kpv_tool',
-    'kpv_transformation',
-    'kpv_support',
-    'kpv_nohero',
-    'kpv_inspiration',
-    'kpv_authentic',
-    'kpv_nextlevel',
-    'kpv_nextchapter',
-    'kpv_workshop',
-    'kpv_openhouse',
-
-    # Lead Generation
-    'lead_openhouse',
-    'lead_workshop',
-    'lead_info',
-
-    # Click Events
-    'click_findout',
-    'click_letschat',
-    'click_openhouse',
-    'click_workshop',
-    'click_info',
-
-    # E-commerce Metrics - Add to Cart
-    'adds_to_cart',
-    'in_app_adds_to_cart',
-    'website_adds_to_cart',
-    'offline_adds_to_cart',
-    'meta_add_to_cart',
-
-    # E-commerce Metrics - Checkouts
-    'checkouts_initiated',
-    'in_app_checkouts',
-    'website_checkouts',
-    'offline_checkouts',
-    'meta_checkouts',
-
-    # E-commerce Metrics - Purchases
-    'purchases',
-    'in_app_purchases',
-    'website_purchases',
-    'offline_purchases',
-    'meta_purchases',
-
-    # Registration Metrics
-    'registrations_completed',
-    'in_app_registrations',
-    'website_registrations',
-    'offline_registrations',
+CRITICAL_CAMPAIGN_COLUMNS: List[str] = [
+    'ad_name',  # or ad_set_name
+    'ad_set_name'
+]
 
-    # Social Engagement Metrics
-    'instagram_profile_visits',
-    'post_comments',
-    'post_reactions',
-    'post_saves',
-    'post_shares',
-    'post_engagements',
-    'video_avg_play_time'
+CRITICAL_NAMING_COLUMNS: List[str] = [
+    'ad_set_name'  # Primary key
 ]
 
 # ============================================================================
-# EXPECTED NAMING KEY COLUMNS
+# DEDUPLICATION KEYS (natural key that pre-filters exact-duplicate row checks)
 # ============================================================================
 
-EXPECTED_NAMING_COLUMNS: List[str] = [
+CAMPAIGN_DEDUP_KEYS: List[str] = [
     'ad_set_name',
-    'audience',
-    'concept',
-    'position',
-    'ad_descriptor',
-    'ad_direction',
-    'landing_page'
+    'ad_name',
+    'wave_number',
+    'reporting_starts',
+    'reporting_ends'
+]
+
+NAMING_DEDUP_KEYS: List[str] = [
+    'ad_set_name',
+    'wave_number'
 ]
 
 # ============================================================================
-# CRITICAL COLUMNS (Must be present)
+# LOW-CARDINALITY COLUMNS (stored as pandas 'category' dtype)
 # ============================================================================
 
-CRITICAL_CAMPAIGN_COLUMNS: List[str] = [
-    'ad_name',  # or ad_set_name
-    'ad_set_name'
-]
-
-CRITICAL_NAMING_COLUMNS: List[str] = [
-    'ad_set_name'  # Primary key
+CAMPAIGN_CATEGORICAL: List[str] = [
+    'ad_delivery',
+    'attribution_setting',
+    'ad_set_budget_type',
+    'bid_type',
+    'result_indicator'
 ]
 
 # ============================================================================
@@ -270,6 +199,15 @@ NAMING_COLUMN_TYPES = {
     'landing_page': 'STRING'
 }
 
+# Expected column names (in schema order), derived from the type definitions above
+# so the schema is only declared once
+EXPECTED_CAMPAIGN_COLUMNS: List[str] = list(CAMPAIGN_COLUMN_TYPES)
+EXPECTED_NAMING_COLUMNS: List[str] = list(NAMING_COLUMN_TYPES)
+
+# Frozen column-name sets for O(1) membership checks against the schema
+EXPECTED_CAMPAIGN_COLUMN_SET: FrozenSet[str] = frozenset(CAMPAIGN_COLUMN_TYPES)
+EXPECTED_NAMING_COLUMN_SET: FrozenSet[str] = frozenset(NAMING_COLUMN_TYPES)
+
 # ============================================================================
 # UI CONFIGURATION
 # ============================================================================
@@ -283,8 +221,10 @@ DEFAULT_YEAR: int = 2024
 
 # ============================================================================
 # HELPER FUNCTIONS FOR SCHEMA AND TABLE NAMING
+# (pure functions of hashable arguments, cached since Streamlit reruns repeat them)
 # ============================================================================
 
+@functools.lru_cache(maxsize=256)
 def get_schema_name(client_name: str, year: int) -> str:
     """
     Generate schema name from client and year.
@@ -300,6 +240,7 @@ def get_schema_name(client_name: str, year: int) -> str:
     return f"CLIENT_{client_name.upper()}_{year}"
 
 
+@functools.lru_cache(maxsize=256)
 def get_table_name(platform: str, table_base: str) -> str:
     """
     Generate platform-prefixed table name.
@@ -315,6 +256,7 @@ def get_table_name(platform: str, table_base: str) -> str:
     return f"{platform.upper()}_{table_base}"
 
 
+@functools.lru_cache(maxsize=256)
 def get_full_table_name(client_name: str, year: int, platform: str, table_base: str) -> str:
     """
     Generate fully qualified table name.
@@ -334,6 +276,7 @@ def get_full_table_name(client_name: str, year: int, platform: str, table_base:
     return f"{schema}.{table}"
 
 
+@functools.lru_cache(maxsize=256)
 def get_stage_name(client_name: str, year: int) -> str:
     """
     Generate stage name for schema.
@@ -350,6 +293,7 @@ def get_stage_name(client_name: str, year: int) -> str:
     return f"{schema}_STAGE"
 
 
+@functools.lru_cache(maxsize=256)
 def get_view_name(platform: str, view_base: str = "AUDIENCE_AD_DESCRIPTOR_DATA") -> str:
     """
     Generate platform-prefixed view name.
@@ -4,76 +4,243 @@ Data access and file operations for campaign data processing.
 
 import pandas as pd
 import logging
-from typing import Dict, Tuple
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
 import validators as streamlit_validators
+import constants
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point (streamlit_app.py)
 logger = logging.getLogger(__name__)
 
+# Use the multi-threaded PyArrow CSV parser when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    CSV_READ_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_READ_ENGINE = 'c'
+
+# Pandas dtypes used when reading CSVs whose target schema is already known
+PANDAS_DTYPES = {
+    'INT': 'Int64',
+    'FLOAT': 'Float64',
+    'STRING': 'string'
+}
+
+
+def _build_read_dtypes(column_types: Dict[str, str]) -> Dict[str, str]:
+    """Map normalized column names to the pandas dtype read_csv should use."""
+    return {col: PANDAS_DTYPES[t] for col, t in column_types.items() if t in PANDAS_DTYPES}
+
+
+def _build_parse_dates(column_types: Dict[str, str]) -> List[str]:
+    """List normalized column names that read_csv should parse as datetimes."""
+    return [col for col, t in column_types.items() if t == 'DATETIME']
+
+
+# Time formats like '0:00:00', '1:23:45' that leak into numeric metric columns
+TIME_RE = re.compile(r'^\d{1,2}:\d{2}:\d{2}$')
+
+# Number of non-null values probed when inferring the type of a new column
+INFERENCE_SAMPLE_SIZE = 1000
+
+# Minimum share of sampled values that must convert for a column to be treated as numeric/datetime
+NUMERIC_INFERENCE_THRESHOLD = 0.8
+DATETIME_INFERENCE_THRESHOLD = 0.8
+
+# Campaign columns declared numeric in the schema (the only ones cleaned of time values)
+NUMERIC_COLS = frozenset(c for c, t in constants.CAMPAIGN_COLUMN_TYPES.items() if t in ('INT', 'FLOAT'))
+
+# Campaign schema columns grouped by target type for batched conversion
+CAMPAIGN_NUMERIC = [c for c, t in constants.CAMPAIGN_COLUMN_TYPES.items() if t in ('INT', 'FLOAT')]
+CAMPAIGN_STRING = [c for c, t in constants.CAMPAIGN_COLUMN_TYPES.items() if t == 'STRING']
+CAMPAIGN_DATETIME = [c for c, t in constants.CAMPAIGN_COLUMN_TYPES.items() if t == 'DATETIME']
+
+
+# Meta/LinkedIn exports use ISO-8601 timestamps; a pinned format takes pandas' vectorized fast path
+DATETIME_FORMAT = 'ISO8601'
+
+
+def _to_datetime(series: pd.Series) -> pd.Series:
+    """
+    Convert a Series to datetimes, parsing as ISO-8601 first.
+    Falls back to pandas' format inference if any non-null value is not ISO-8601.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    parsed = pd.to_datetime(series, format=DATETIME_FORMAT, errors='coerce')
+    if (parsed.isna() & series.notna()).any():
+        parsed = pd.to_datetime(series, errors='coerce')
+    return parsed
+
+
+def _blank_to_na(series: pd.Series) -> pd.Series:
+    """Return the Series with empty or whitespace-only strings replaced by NA."""
+    blank_mask = series.astype('string').str.strip().eq('').fillna(False)
+    return series.mask(blank_mask)
+
+
+def _drop_duplicate_rows(df: pd.DataFrame, keys: List[str], label: str) -> pd.DataFrame:
+    """
+    Drop exact duplicate rows, comparing whole rows only where the natural key repeats.
+
+    Hashing the few key columns first means rows with a unique key never have every
+    column hashed. Rows that share a key but differ elsewhere are kept.
+
+    Args:
+        df: DataFrame to deduplicate
+        keys: Natural key columns present in df
+        label: Data name used in log messages (e.g., 'campaign')
+
+    Returns:
+        DataFrame without exact duplicate rows (df itself if there were none)
+    """
+    if not keys:
+        return df.drop_duplicates()
+    candidates = df.duplicated(subset=keys, keep=False).to_numpy()
+    if not candidates.any():
+        return df
+
+    drop = candidates.copy()
+    drop[candidates] = df[candidates].duplicated().to_numpy()
+    key_conflicts = int(df[candidates].duplicated(subset=keys).sum()) - int(drop.sum())
+    if key_conflicts:
+        logger.warning(f"{key_conflicts} {label} row(s) share a key {keys} with another row but differ; kept")
+    if not drop.any():
+        return df
+    logger.info(f"Removed {int(drop.sum())} exact duplicate {label} row(s)")
+    return df.take((~drop).nonzero()[0])
+
+
+SCHEMA_DTYPE_CAMPAIGN = _build_read_dtypes(constants.CAMPAIGN_COLUMN_TYPES)
+PARSE_DATES_CAMPAIGN = _build_parse_dates(constants.CAMPAIGN_COLUMN_TYPES)
+SCHEMA_DTYPE_NAMING = _build_read_dtypes(constants.NAMING_COLUMN_TYPES)
+PARSE_DATES_NAMING = _build_parse_dates(constants.NAMING_COLUMN_TYPES)
+
+
+def _polars_enabled() -> bool:
+    """Return True if USE_POLARS is set and the optional polars/pyarrow packages are importable."""
+    if os.getenv('USE_POLARS', '').lower() not in ('1', 'true', 'yes'):
+        return False
+    try:
+        import polars  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("USE_POLARS is set but polars/pyarrow are not installed, using pandas preprocessing")
+        return False
+    return True
+
 
 class CampaignDataProcessor:
     """Main class for processing campaign and naming key data."""
     
+    # Expected schemas, shared with constants.py rather than rebuilt per instance
+    expected_campaign_columns = constants.CAMPAIGN_COLUMN_TYPES
+    expected_naming_columns = constants.NAMING_COLUMN_TYPES
+    
     def __init__(self):
-        """Initialize the data processor with expected schemas."""
-        
-        # Define expected columns for campaign data
-        self.expected_campaign_columns = {
-            # Campaign & Ad Info
-            'campaign_name': 'STRING', 'ad_name': 'STRING', 'ad_set_name': 'STRING', 'ad_delivery': 'STRING',
-            'starts': 'DATETIME', 'ends': 'DATETIME', 'reporting_starts': 'DATETIME',
-            'reporting_ends': 'DATETIME', 'last_significant_edit': 'DATETIME',
-            'wave_number': 'INT', 'attribution_setting': 'STRING',
-            # Budget & Spend
-            'amount_spent_usd': 'FLOAT', 'ad_set_budget': 'FLOAT', 'ad_set_budget_type': 'STRING',
-            'bid': 'FLOAT', 'bid_type': 'STRING', 'cpm_usd': 'FLOAT',
-            # Core Performance Metrics
-            'results': 'INT', 'result_indicator': 'STRING', 'cost_per_result': 'FLOAT',
-            'frequency': 'FLOAT', 'reach': 'INT', 'impressions': 'INT',
-            'unique_link_clicks': 'INT', 'landing_page_views': 'INT', 'email_signups': 'INT',
-            # Essential KPIs (lowercase for consistency with sql_templates.py)
-            'kpv_community': 'INT', 'kpv_tool': 'INT', 'kpv_transformation': 'INT',
-            'kpv_support': 'INT', 'kpv_nohero': 'INT', 'kpv_inspiration': 'INT',
-            'kpv_authentic': 'INT', 'kpv_nextlevel': 'INT', 'kpv_nextchapter': 'INT',
-            'kpv_workshop': 'INT', 'kpv_openhouse': 'INT',
-            # Lead Generation (lowercase for consistency)
-            'lead_openhouse': 'INT', 'lead_workshop': 'INT', 'lead_info': 'INT',
-            # Click Events (lowercase for consistency)
-            'click_findout': 'INT', 'click_letschat': 'INT', 'click_openhouse': 'INT',
-            'click_workshop': 'INT', 'click_info': 'INT',
-            # E-commerce Metrics - Add to Cart
-            'adds_to_cart': 'INT', 'in_app_adds_to_cart': 'INT', 'website_adds_to_cart': 'INT',
-            'offline_adds_to_cart': 'INT', 'meta_add_to_cart': 'INT',
-            # E-commerce Metrics - Checkouts
-            'checkouts_initiated': 'INT', 'in_app_checkouts': 'INT', 'website_checkouts': 'INT',
-            'offline_checkouts': 'INT', 'meta_checkouts': 'INT',
-            # E-commerce Metrics - Purchases
-            'purchases': 'INT', 'in_app_purchases': 'INT', 'website_purchases': 'INT',
-            'offline_purchases': 'INT', 'meta_purchases': 'INT',
-            # Registration Metrics
-            'registrations_completed': 'INT', 'in_app_registrations': 'INT',
-            'website_registrations': 'INT', 'offline_registrations': 'INT',
-            # Social Engagement Metrics
-            'instagram_profile_visits': 'INT', 'post_comments': 'INT', 'post_reactions': 'INT',
-            'post_saves': 'INT', 'post_shares': 'INT', 'post_engagements': 'INT',
-            'video_avg_play_time': 'FLOAT'
-        }
+        """Initialize the data processor."""
         
-        # Define expected columns for naming key
-        self.expected_naming_columns = {
-            'ad_set_name': 'STRING',
-            'audience': 'STRING',
-            'concept': 'STRING',
-            'position': 'STRING',
-            'ad_descriptor': 'STRING',
-            'ad_direction': 'STRING',
-            'landing_page': 'STRING'
-        }
+        # Inferred column types keyed on (column name, length, sample hash); reset per file pair
+        self._infer_cache: Dict[Tuple, str] = {}
+
+    def _schema_read_args(self, file_path: str, schema_dtype: Dict[str, str], parse_dates: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Map the file's raw headers onto the schema to build read_csv dtype/parse_dates arguments.
+
+        Args:
+            file_path: Path to CSV file
+            schema_dtype: Normalized column name -> pandas dtype
+            parse_dates: Normalized column names to parse as datetimes
+
+        Returns:
+            Tuple of (raw column name -> dtype, raw column names to parse as datetimes)
+        """
+        header = pd.read_csv(file_path, nrows=0).columns
+        date_cols = set(parse_dates)
+
+        dtype = {}
+        dates = []
+        for raw_col in header:
+            normalized_col = streamlit_validators.normalize_column_name(raw_col)
+            if normalized_col in schema_dtype:
+                dtype[raw_col] = schema_dtype[normalized_col]
+            elif normalized_col in date_cols:
+                dates.append(raw_col)
+
+        return dtype, dates
+
+    def _read_csv_chunks(self, file_path: str, schema_dtype: Dict[str, str], parse_dates: List[str]) -> Tuple[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Read a CSV as a first chunk plus an iterator over the remaining chunks.
+
+        Files smaller than CHUNKED_READ_MIN_SIZE_MB are read whole with _read_csv_typed.
+        Larger files are streamed CSV_CHUNK_SIZE rows at a time; only string columns
+        get an explicit dtype there since a failed typed read cannot be retried mid-stream
+        (numeric/datetime columns are coerced by preprocessing anyway). Columns outside
+        the schema are read as str so every chunk agrees on their type; they are typed
+        once on the combined frame by preprocess_campaign_chunks.
+
+        Args:
+            file_path: Path to CSV file
+            schema_dtype: Normalized column name -> pandas dtype
+            parse_dates: Normalized column names to parse as datetimes
+
+        Returns:
+            Tuple of (first chunk, iterator over remaining chunks)
+        """
+        if os.path.getsize(file_path) < constants.CHUNKED_READ_MIN_SIZE_MB * 1024 * 1024:
+            return self._read_csv_typed(file_path, schema_dtype, parse_dates), iter(())
+
+        dtype, dates = self._schema_read_args(file_path, schema_dtype, parse_dates)
+        read_dtype = {col: d for col, d in dtype.items() if d == 'string'}
+        schema_cols = set(dtype).union(dates)
+        read_dtype.update(
+            {col: str for col in pd.read_csv(file_path, nrows=0).columns if col not in schema_cols}
+        )
+
+        reader = pd.read_csv(file_path, dtype=read_dtype, chunksize=constants.CSV_CHUNK_SIZE, low_memory=False)
+        first_chunk = next(reader, None)
+        if first_chunk is None:
+            return pd.DataFrame(), iter(())
+
+        logger.info(f"Reading {file_path} in chunks of {constants.CSV_CHUNK_SIZE} rows")
+        return first_chunk, reader
+
+    def _read_csv_typed(self, file_path: str, schema_dtype: Dict[str, str], parse_dates: List[str]) -> pd.DataFrame:
+        """
+        Read a CSV using the known schema so pandas can skip dtype inference.
+        Parses with the PyArrow engine when available, otherwise the C engine.
+
+        Raw headers are normalized to match schema names; columns outside the
+        schema are left for pandas to infer. Falls back to an untyped read if
+        the typed read fails (e.g. mixed-type values in a numeric column).
+
+        Args:
+            file_path: Path to CSV file
+            schema_dtype: Normalized column name -> pandas dtype
+            parse_dates: Normalized column names to parse as datetimes
+
+        Returns:
+            Loaded DataFrame (raw column names preserved)
+        """
+        dtype, dates = self._schema_read_args(file_path, schema_dtype, parse_dates)
+
+        read_kwargs = {'engine': CSV_READ_ENGINE}
+        if CSV_READ_ENGINE == 'c':
+            read_kwargs['low_memory'] = False
+        
+        try:
+            return pd.read_csv(file_path, dtype=dtype, parse_dates=dates, **read_kwargs)
+        except (ValueError, TypeError, pd.errors.ParserError) as e:
+            logger.warning(f"Typed read of {file_path} failed ({e}), falling back to untyped read")
+            return pd.read_csv(file_path)
 
     def _infer_column_type(self, series: pd.Series) -> str:
         """
         Infer the intended data type of a column by analyzing its values.
+        Results are memoized per column, and only a sample of non-null values is probed.
         
         Args:
             series: Pandas Series to analyze
@@ -91,18 +258,37 @@ class CampaignDataProcessor:
         if pd.api.types.is_bool_dtype(series):
             return 'INT'
         
-        # For object/string columns, try to infer by converting
+        sample_hash = int(pd.util.hash_pandas_object(series.head(64), index=False).sum())
+        cache_key = (series.name, len(series), sample_hash)
+        if cache_key in self._infer_cache:
+            return self._infer_cache[cache_key]
+        
+        inferred_type = self._infer_object_column_type(series)
+        self._infer_cache[cache_key] = inferred_type
+        return inferred_type
+
+    def _infer_object_column_type(self, series: pd.Series) -> str:
+        """
+        Infer the type of an object/string column from a sample of its non-null values.
+        
+        Args:
+            series: Pandas Series to analyze
+            
+        Returns:
+            Data type as string: 'INT', 'FLOAT', 'DATETIME', or 'STRING'
+        """
         # Drop nulls for analysis
         non_null = series.dropna()
         if len(non_null) == 0:
             return 'STRING'
+        non_null = non_null.head(INFERENCE_SAMPLE_SIZE)
         
         # Try converting to numeric
         numeric_converted = pd.to_numeric(non_null, errors='coerce')
         numeric_success_rate = numeric_converted.notna().sum() / len(non_null)
         
         # If >80% can be converted to numeric, treat as numeric
-        if numeric_success_rate > 0.8:
+        if numeric_success_rate > NUMERIC_INFERENCE_THRESHOLD:
             # Check if all successful conversions are integers
             successful_numeric = numeric_converted.dropna()
             if len(successful_numeric) > 0:
@@ -113,7 +299,7 @@ class CampaignDataProcessor:
         try:
             datetime_converted = pd.to_datetime(non_null, errors='coerce')
             datetime_success_rate = datetime_converted.notna().sum() / len(non_null)
-            if datetime_success_rate > 0.8:
+            if datetime_success_rate > DATETIME_INFERENCE_THRESHOLD:
                 return 'DATETIME'
         except:
             pass
@@ -123,44 +309,41 @@ class CampaignDataProcessor:
 
     def _clean_time_formatted_values(self, df: pd.DataFrame) -> None:
         """
-        Clean time-formatted string values (e.g., '0:00:00', '1:23:45') from ALL columns.
-        This is applied to any column that should be numeric based on its data.
-        Modifies DataFrame in place.
+        Clean time-formatted string values (e.g., '0:00:00', '1:23:45') from numeric columns.
+        Only columns declared INT/FLOAT in the schema are scanned; new columns are
+        coerced later by _process_new_columns. Modifies DataFrame in place.
         
         Args:
             df: DataFrame to clean
         """
-        # Pattern to match time formats like '0:00:00', '1:23:45', 'HH:MM:SS'
-        time_pattern = r'^\d{1,2}:\d{2}:\d{2}$'
-        
         total_cleaned = 0
+        cleaned_columns = 0
         
-        for col in df.columns:
-            # Skip if already numeric type
-            if pd.api.types.is_numeric_dtype(df[col]):
-                continue
+        for col in df.columns.intersection(NUMERIC_COLS):
+            series = df[col]
             
-            # Infer what type this column should be
-            inferred_type = self._infer_column_type(df[col])
+            if series.dtype == object:
+                # Object columns may mix strings with other values; only strings can be times
+                time_mask = series.map(lambda v: isinstance(v, str) and TIME_RE.match(v) is not None)
+            elif pd.api.types.is_string_dtype(series.dtype):
+                # string[python]/string[pyarrow] (and pandas 3 str) accept the pattern text, not a compiled re
+                time_mask = series.str.match(TIME_RE.pattern, na=False)
+            else:
+                # Already typed by read_csv (numeric, datetime, ...): no time strings to clean
+                continue
             
-            # Only clean if column should be numeric
-            if inferred_type in ['INT', 'FLOAT']:
-                # Convert to string to check for time patterns
-                col_as_str = df[col].astype(str)
+            if time_mask.any():
+                count_cleaned = time_mask.sum()
+                total_cleaned += count_cleaned
+                cleaned_columns += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Column '{col}': Found {count_cleaned} time-formatted values, converting to NaN")
                 
-                # Find values matching time pattern or other non-numeric patterns
-                time_mask = col_as_str.str.match(time_pattern, na=False)
-                
-                if time_mask.any():
-                    count_cleaned = time_mask.sum()
-                    total_cleaned += count_cleaned
-                    logger.info(f"Column '{col}': Found {count_cleaned} time-formatted values, converting to NaN (inferred type: {inferred_type})")
-                    
-                    # Replace time-formatted strings with NaN
-                    df.loc[time_mask, col] = None
+                # Replace time-formatted strings with NaN
+                df[col] = series.mask(time_mask)
         
         if total_cleaned > 0:
-            logger.info(f"✓ Total time-formatted values cleaned: {total_cleaned}")
+            logger.info(f"✓ Total time-formatted values cleaned: {total_cleaned} across {cleaned_columns} column(s)")
 
     def _process_new_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -173,16 +356,26 @@ class CampaignDataProcessor:
         Returns:
             DataFrame with new columns properly typed
         """
-        # Find columns not in expected schema
-        expected_cols = set(self.expected_campaign_columns.keys())
-        new_cols = [col for col in df.columns if col not in expected_cols]
+        # Find columns not in expected schema (hashed Index lookup, order preserved)
+        new_cols = df.columns[~df.columns.isin(constants.EXPECTED_CAMPAIGN_COLUMN_SET)].tolist()
         
         if new_cols:
             logger.info(f"Found {len(new_cols)} new columns not in schema: {new_cols}")
             
             for col in new_cols:
-                inferred_type = self._infer_column_type(df[col])
-                logger.info(f"  - {col}: inferred type = {inferred_type}")
+                series = df[col]
+                
+                # Already given a concrete dtype by read_csv, nothing to infer or convert
+                if (pd.api.types.is_integer_dtype(series)
+                        or pd.api.types.is_float_dtype(series)
+                        or pd.api.types.is_datetime64_any_dtype(series)):
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"  - {col}: already typed as {series.dtype}")
+                    continue
+                
+                inferred_type = self._infer_column_type(series)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"  - {col}: inferred type = {inferred_type}")
                 
                 # Convert based on inferred type
                 if inferred_type == 'INT':
@@ -190,36 +383,38 @@ class CampaignDataProcessor:
                 elif inferred_type == 'FLOAT':
                     df[col] = pd.to_numeric(df[col], errors='coerce')
                 elif inferred_type == 'DATETIME':
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
+                    df[col] = _to_datetime(df[col])
                 elif inferred_type == 'STRING':
-                    df[col] = df[col].astype(str).fillna('')
+                    df[col] = df[col].fillna('').astype('string')
         
         return df
 
-    def preprocess_campaign_data(self, df: pd.DataFrame, wave_number: int) -> pd.DataFrame:
+    def preprocess_campaign_data(self, df: pd.DataFrame, wave_number: int, process_new_columns: bool = True) -> pd.DataFrame:
         """
         Preprocess campaign data DataFrame with robust handling of new columns and data quality issues.
+        The input DataFrame is modified in place (columns renamed and cleaned) and should
+        not be reused by the caller.
         
         Args:
             df: Raw campaign data DataFrame
             wave_number: Wave number to add to data
+            process_new_columns: Type columns outside the schema (off for chunks, which
+                are typed together after they are combined)
             
         Returns:
             Processed campaign DataFrame
         """
         logger.info(f"Preprocessing campaign data with {len(df)} rows")
         
-        # Create a copy to avoid modifying original
-        processed_df = df.copy()
+        # Work on the caller's DataFrame directly; process_files discards the raw frame
+        processed_df = df
         
         # Normalize all column names (remove spaces, make lowercase, replace special chars)
-        column_mapping = {}
-        for col in processed_df.columns:
-            normalized_col = streamlit_validators.normalize_column_name(col)
-            column_mapping[col] = normalized_col
+        column_mapping = {col: streamlit_validators.normalize_column_name(col) for col in processed_df.columns}
         
-        # Rename columns
-        processed_df = processed_df.rename(columns=column_mapping)
+        # Rename columns (skipped when headers are already normalized)
+        if any(col != normalized_col for col, normalized_col in column_mapping.items()):
+            processed_df.rename(columns=column_mapping, inplace=True)
         
         logger.info("Step 1: Column normalization complete")
         
@@ -240,59 +435,144 @@ class CampaignDataProcessor:
             logger.info("ad_set_name column missing, using ad_name as fallback")
             processed_df['ad_set_name'] = processed_df['ad_name']
         elif 'ad_name' in processed_df.columns and 'ad_set_name' in processed_df.columns:
-            # Check for null/empty values in ad_name and fill with ad_set_name
-            ad_name_null_mask = processed_df['ad_name'].isnull() | (processed_df['ad_name'].astype(str).str.strip() == '')
-            if ad_name_null_mask.any():
-                logger.info(f"Found {ad_name_null_mask.sum()} null/empty ad_name values, filling with ad_set_name")
-                processed_df.loc[ad_name_null_mask, 'ad_name'] = processed_df.loc[ad_name_null_mask, 'ad_set_name']
+            # Treat null/empty values as missing and fill each column from the other
+            ad_name = _blank_to_na(processed_df['ad_name'])
+            ad_set_name = _blank_to_na(processed_df['ad_set_name'])
+            
+            ad_name_missing = ad_name.isna().sum()
+            if ad_name_missing:
+                logger.info(f"Found {ad_name_missing} null/empty ad_name values, filling with ad_set_name")
+            ad_set_name_missing = ad_set_name.isna().sum()
+            if ad_set_name_missing:
+                logger.info(f"Found {ad_set_name_missing} null/empty ad_set_name values, filling with ad_name")
             
-            # Check for null/empty values in ad_set_name and fill with ad_name
-            ad_set_name_null_mask = processed_df['ad_set_name'].isnull() | (processed_df['ad_set_name'].astype(str).str.strip() == '')
-            if ad_set_name_null_mask.any():
-                logger.info(f"Found {ad_set_name_null_mask.sum()} null/empty ad_set_name values, filling with ad_name")
-                processed_df.loc[ad_set_name_null_mask, 'ad_set_name'] = processed_df.loc[ad_set_name_null_mask, 'ad_name']
+            processed_df['ad_name'] = ad_name.combine_first(ad_set_name)
+            processed_df['ad_set_name'] = ad_set_name.combine_first(ad_name)
+        
+        # Add missing columns with default values in a single assign
+        # (metrics and dates stay NULL, strings default to empty)
+        missing_defaults = {
+            col: ('' if dtype == 'STRING' else None)
+            for col, dtype in self.expected_campaign_columns.items()
+            if col not in processed_df.columns
+        }
+        if missing_defaults:
+            processed_df = processed_df.assign(**missing_defaults)
         
-        # Add missing columns with default values
-        for col, dtype in self.expected_campaign_columns.items():
-            if col not in processed_df.columns:
-                if dtype == 'INT':
-                    processed_df[col] = None  # Keep as NULL for missing metrics
-                elif dtype == 'FLOAT':
-                    processed_df[col] = None  # Keep as NULL for missing metrics
-                elif dtype == 'STRING':
-                    processed_df[col] = ''
-                elif dtype == 'DATETIME':
-                    processed_df[col] = None
+        # Convert data types for EXPECTED columns, one vectorized op per type group
+        processed_df[CAMPAIGN_NUMERIC] = processed_df[CAMPAIGN_NUMERIC].apply(pd.to_numeric, errors='coerce')  # Keep NULLs as NULL
+        # Keep as datetime object for proper Snowflake TIMESTAMP_NTZ insertion
+        processed_df[CAMPAIGN_DATETIME] = processed_df[CAMPAIGN_DATETIME].apply(_to_datetime)
+        processed_df[CAMPAIGN_STRING] = processed_df[CAMPAIGN_STRING].fillna('').astype('string')
         
-        # Convert data types for EXPECTED columns
-        for col, dtype in self.expected_campaign_columns.items():
-            if col in processed_df.columns:
-                if dtype == 'INT':
-                    processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')  # Keep NULLs as NULL
-                elif dtype == 'FLOAT':
-                    processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')  # Keep NULLs as NULL
-                elif dtype == 'STRING':
-                    processed_df[col] = processed_df[col].astype(str).fillna('')
-                elif dtype == 'DATETIME':
-                    # Keep as datetime object for proper Snowflake TIMESTAMP_NTZ insertion
-                    processed_df[col] = pd.to_datetime(processed_df[col], errors='coerce')
+        # Enum-like string columns are far smaller and faster to hash as categoricals
+        categorical_cols = [c for c in constants.CAMPAIGN_CATEGORICAL if c in processed_df.columns]
+        processed_df[categorical_cols] = processed_df[categorical_cols].astype('category')
         
         logger.info("Step 3: Expected columns type conversion complete")
         
         # Process NEW columns not in the expected schema with intelligent type inference
-        processed_df = self._process_new_columns(processed_df)
-        
-        logger.info("Step 4: New columns processed and typed")
+        if process_new_columns:
+            processed_df = self._process_new_columns(processed_df)
+            logger.info("Step 4: New columns processed and typed")
         
-        # Remove duplicates
-        processed_df = processed_df.drop_duplicates()
+        # Remove exact duplicate rows (only rows with a repeated natural key are compared in full)
+        dedup_keys = [c for c in constants.CAMPAIGN_DEDUP_KEYS if c in processed_df.columns]
+        processed_df = _drop_duplicate_rows(processed_df, dedup_keys, 'campaign')
         
         logger.info(f"✓ Preprocessing complete: {len(processed_df)} rows, {len(processed_df.columns)} columns")
         return processed_df
 
+    def preprocess_campaign_data_polars(self, df: pd.DataFrame, wave_number: int, process_new_columns: bool = True) -> pd.DataFrame:
+        """
+        Polars implementation of preprocess_campaign_data (opt-in via USE_POLARS).
+        
+        Header normalization, time-value cleaning, fallbacks, missing-column fill,
+        type casts and deduplication run as one multi-threaded Polars pipeline;
+        new-column inference and categorical conversion reuse the pandas steps.
+        Requires the optional 'polars' package.
+        
+        Args:
+            df: Raw campaign data DataFrame (modified in place)
+            wave_number: Wave number to add to data
+            process_new_columns: Type columns outside the schema (see preprocess_campaign_data)
+            
+        Returns:
+            Processed campaign DataFrame
+        """
+        import polars as pl
+        
+        logger.info(f"Preprocessing campaign data with {len(df)} rows (Polars)")
+        
+        # Normalize all column names (remove spaces, make lowercase, replace special chars)
+        column_mapping = {col: streamlit_validators.normalize_column_name(col) for col in df.columns}
+        if any(col != normalized_col for col, normalized_col in column_mapping.items()):
+            df.rename(columns=column_mapping, inplace=True)
+        
+        pl_df = pl.from_pandas(df)
+        schema = pl_df.schema
+        
+        # Handle ad_name fallback logic - use ad_set_name if ad_name is missing or has null values
+        if 'ad_name' not in schema and 'ad_set_name' in schema:
+            pl_df = pl_df.with_columns(pl.col('ad_set_name').alias('ad_name'))
+        elif 'ad_name' in schema and 'ad_set_name' not in schema:
+            pl_df = pl_df.with_columns(pl.col('ad_name').alias('ad_set_name'))
+        elif 'ad_name' in schema and 'ad_set_name' in schema:
+            blank_to_null = [
+                pl.when(pl.col(col).cast(pl.Utf8).str.strip_chars() == '').then(None).otherwise(pl.col(col)).alias(col)
+                for col in ('ad_name', 'ad_set_name')
+            ]
+            pl_df = pl_df.with_columns(blank_to_null).with_columns(
+                pl.col('ad_name').fill_null(pl.col('ad_set_name')),
+                pl.col('ad_set_name').fill_null(pl.col('ad_name'))
+            )
+        schema = pl_df.schema
+        
+        # Convert data types for EXPECTED columns, adding missing ones as NULL / empty string
+        casts = []
+        for col in CAMPAIGN_NUMERIC:
+            if col not in schema:
+                casts.append(pl.lit(None, dtype=pl.Float64).alias(col))
+            elif schema[col] == pl.Utf8:
+                # Clean time-formatted strings like '0:00:00' before the numeric cast
+                expr = pl.when(pl.col(col).str.contains(TIME_RE.pattern)).then(None).otherwise(pl.col(col))
+                casts.append(expr.cast(pl.Float64, strict=False).alias(col))
+            else:
+                casts.append(pl.col(col).cast(pl.Float64, strict=False))
+        for col in CAMPAIGN_DATETIME:
+            if col in schema and schema[col] == pl.Utf8:
+                casts.append(pl.col(col).str.to_datetime(strict=False))
+            elif col not in schema or not isinstance(schema[col], pl.Datetime):
+                casts.append(pl.lit(None, dtype=pl.Datetime).alias(col))
+        for col in CAMPAIGN_STRING:
+            if col not in schema:
+                casts.append(pl.lit('').alias(col))
+            else:
+                casts.append(pl.col(col).cast(pl.Utf8).fill_null(''))
+        
+        pl_df = pl_df.with_columns(casts).with_columns(pl.lit(wave_number, dtype=pl.Int64).alias('wave_number'))
+        
+        # Remove exact duplicate rows (Polars hashes whole rows across threads)
+        pl_df = pl_df.unique(keep='first', maintain_order=True)
+        
+        processed_df = pl_df.to_pandas()
+        del pl_df
+        
+        processed_df[CAMPAIGN_STRING] = processed_df[CAMPAIGN_STRING].astype('string')
+        categorical_cols = [c for c in constants.CAMPAIGN_CATEGORICAL if c in processed_df.columns]
+        processed_df[categorical_cols] = processed_df[categorical_cols].astype('category')
+        
+        # Process NEW columns not in the expected schema with intelligent type inference
+        if process_new_columns:
+            processed_df = self._process_new_columns(processed_df)
+        
+        logger.info(f"✓ Preprocessing complete (Polars): {len(processed_df)} rows, {len(processed_df.columns)} columns")
+        return processed_df
+
     def preprocess_naming_data(self, df: pd.DataFrame, wave_number: int) -> pd.DataFrame:
         """
         Preprocess naming key DataFrame.
+        The input DataFrame is modified in place and should not be reused by the caller.
         
         Args:
             df: Raw naming key DataFrame
@@ -303,17 +583,15 @@ class CampaignDataProcessor:
         """
         logger.info(f"Preprocessing naming data with {len(df)} rows")
         
-        # Create a copy to avoid modifying original
-        processed_df = df.copy()
+        # Work on the caller's DataFrame directly; process_files discards the raw frame
+        processed_df = df
         
         # Normalize all column names (remove spaces, make lowercase, replace special chars)
-        column_mapping = {}
-        for col in processed_df.columns:
-            normalized_col = streamlit_validators.normalize_column_name(col)
-            column_mapping[col] = normalized_col
+        column_mapping = {col: streamlit_validators.normalize_column_name(col) for col in processed_df.columns}
         
-        # Rename columns
-        processed_df = processed_df.rename(columns=column_mapping)
+        # Rename columns (skipped when headers are already normalized)
+        if any(col != normalized_col for col, normalized_col in column_mapping.items()):
+            processed_df.rename(columns=column_mapping, inplace=True)
         
         # Add wave number
         processed_df['wave_number'] = wave_number
@@ -338,17 +616,57 @@ class CampaignDataProcessor:
                 elif dtype == 'FLOAT':
                     processed_df[col] = pd.to_numeric(processed_df[col], errors='coerce')  # Keep NULLs as NULL
                 elif dtype == 'STRING':
-                    processed_df[col] = processed_df[col].astype(str).fillna('')
+                    processed_df[col] = processed_df[col].fillna('').astype('string')
                 elif dtype == 'DATETIME':
                     # Keep as datetime object for proper Snowflake TIMESTAMP_NTZ insertion
-                    processed_df[col] = pd.to_datetime(processed_df[col], errors='coerce')
+                    processed_df[col] = _to_datetime(processed_df[col])
         
-        # Remove duplicates
-        processed_df = processed_df.drop_duplicates()
+        # Remove exact duplicate rows (only rows with a repeated natural key are compared in full)
+        dedup_keys = [c for c in constants.NAMING_DEDUP_KEYS if c in processed_df.columns]
+        processed_df = _drop_duplicate_rows(processed_df, dedup_keys, 'naming')
         
         logger.info(f"Preprocessed naming data: {len(processed_df)} rows, {len(processed_df.columns)} columns")
         return processed_df
 
+    def preprocess_campaign_chunks(self, first_chunk: pd.DataFrame, remaining_chunks: Iterator[pd.DataFrame], wave_number: int, use_polars: bool = False) -> Tuple[pd.DataFrame, int]:
+        """
+        Preprocess campaign data chunk by chunk and combine the results.
+        Columns outside the schema are typed once on the combined frame, so a column
+        that looks numeric in one chunk and textual in another gets a single type.
+        
+        Args:
+            first_chunk: First raw campaign chunk (already validated)
+            remaining_chunks: Iterator over the remaining raw chunks
+            wave_number: Wave number to add to data
+            use_polars: Preprocess with preprocess_campaign_data_polars instead of pandas
+            
+        Returns:
+            Tuple of (processed campaign DataFrame, number of raw rows read)
+        """
+        preprocess = self.preprocess_campaign_data_polars if use_polars else self.preprocess_campaign_data
+        
+        raw_rows = len(first_chunk)
+        processed_chunks = [preprocess(first_chunk, wave_number, process_new_columns=False)]
+        
+        for chunk in remaining_chunks:
+            raw_rows += len(chunk)
+            processed_chunks.append(preprocess(chunk, wave_number, process_new_columns=False))
+        
+        if len(processed_chunks) == 1:
+            return self._process_new_columns(processed_chunks[0]), raw_rows
+        
+        processed_df = pd.concat(processed_chunks, ignore_index=True, copy=False)
+        
+        # Duplicates can span chunks, and categories differ per chunk
+        dedup_keys = [c for c in constants.CAMPAIGN_DEDUP_KEYS if c in processed_df.columns]
+        processed_df = _drop_duplicate_rows(processed_df, dedup_keys, 'campaign')
+        categorical_cols = [c for c in constants.CAMPAIGN_CATEGORICAL if c in processed_df.columns]
+        processed_df[categorical_cols] = processed_df[categorical_cols].astype('category')
+        processed_df = self._process_new_columns(processed_df)
+        
+        logger.info(f"✓ Combined {len(processed_chunks)} campaign chunks: {len(processed_df)} rows")
+        return processed_df, raw_rows
+
     def process_files(self, campaign_file_path: str, naming_file_path: str, wave_number: int, client_name: str, platform: str, year: int) -> Dict:
         """
         Process campaign and naming key files.
@@ -365,34 +683,48 @@ class CampaignDataProcessor:
             Dictionary with processing results
         """
         logger.info(f"Starting processing for wave {wave_number}")
+        self._infer_cache.clear()
+        use_polars = _polars_enabled()
         
         try:
-            # Load files
-            campaign_df = pd.read_csv(campaign_file_path)
-            naming_df = pd.read_csv(naming_file_path)
-            
-            logger.info(f"Loaded campaign data: {len(campaign_df)} rows, {len(campaign_df.columns)} columns")
-            logger.info(f"Loaded naming data: {len(naming_df)} rows, {len(naming_df.columns)} columns")
-            
-            # Validate data (returns errors and warnings)
-            campaign_valid, campaign_errors, campaign_warnings = streamlit_validators.validate_campaign_data(campaign_df)
-            naming_valid, naming_errors, naming_warnings = streamlit_validators.validate_naming_data(naming_df)
-            
-            # Combine all warnings
-            all_warnings = campaign_warnings + naming_warnings
-            
-            # Only stop processing for critical errors (empty files, data type issues)
-            if not campaign_valid:
-                logger.error(f"Campaign data validation failed: {campaign_errors}")
-                return {'success': False, 'errors': campaign_errors, 'warnings': all_warnings}
-            
-            if not naming_valid:
-                logger.error(f"Naming data validation failed: {naming_errors}")
-                return {'success': False, 'errors': naming_errors, 'warnings': all_warnings}
-            
-            # Preprocess data
-            processed_campaign_df = self.preprocess_campaign_data(campaign_df, wave_number)
-            processed_naming_df = self.preprocess_naming_data(naming_df, wave_number)
+            # Campaign and naming files are independent, so load, validate and
+            # preprocess them side by side (pandas releases the GIL while parsing)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Load files
+                campaign_future = executor.submit(self._read_csv_chunks, campaign_file_path, SCHEMA_DTYPE_CAMPAIGN, PARSE_DATES_CAMPAIGN)
+                naming_future = executor.submit(self._read_csv_typed, naming_file_path, SCHEMA_DTYPE_NAMING, PARSE_DATES_NAMING)
+                (campaign_df, campaign_remaining_chunks), naming_df = campaign_future.result(), naming_future.result()
+                
+                logger.info(f"Loaded campaign data: {len(campaign_df)} rows, {len(campaign_df.columns)} columns")
+                logger.info(f"Loaded naming data: {len(naming_df)} rows, {len(naming_df.columns)} columns")
+                
+                # Validate data (returns errors and warnings)
+                campaign_future = executor.submit(streamlit_validators.validate_campaign_data, campaign_df)
+                naming_future = executor.submit(streamlit_validators.validate_naming_data, naming_df)
+                campaign_valid, campaign_errors, campaign_warnings = campaign_future.result()
+                naming_valid, naming_errors, naming_warnings = naming_future.result()
+                
+                # Combine all warnings
+                all_warnings = campaign_warnings + naming_warnings
+                
+                # Only stop processing for critical errors (empty files, data type issues)
+                if not campaign_valid:
+                    logger.error(f"Campaign data validation failed: {campaign_errors}")
+                    return {'success': False, 'errors': campaign_errors, 'warnings': all_warnings}
+                
+                if not naming_valid:
+                    logger.error(f"Naming data validation failed: {naming_errors}")
+                    return {'success': False, 'errors': naming_errors, 'warnings': all_warnings}
+                
+                campaign_column_count = len(campaign_df.columns)
+                original_naming_shape = naming_df.shape
+                
+                # Preprocess data (in place) and drop the raw references so they can be freed
+                campaign_future = executor.submit(self.preprocess_campaign_chunks, campaign_df, campaign_remaining_chunks, wave_number, use_polars)
+                naming_future = executor.submit(self.preprocess_naming_data, naming_df, wave_number)
+                (processed_campaign_df, campaign_row_count), processed_naming_df = campaign_future.result(), naming_future.result()
+                del campaign_df, naming_df
+                original_campaign_shape = (campaign_row_count, campaign_column_count)
             
             # Generate quality report
             quality_report = streamlit_validators.generate_data_quality_report(processed_campaign_df, processed_naming_df)
@@ -401,7 +733,7 @@ class CampaignDataProcessor:
 
             # Generate dynamic schema name (NEW: without platform)
             # Format: CLIENT_CATERPILLAR_2024 (not CLIENT_CATERPILLAR_META_2024)
-            schema_name = f"CLIENT_{client_name.upper()}_{year}"
+            schema_name = constants.get_schema_name(client_name, year)
 
             return {
                 'success': True,
@@ -413,8 +745,8 @@ class CampaignDataProcessor:
                 'client_name': client_name,
                 'platform': platform,
                 'year': year,
-                'original_campaign_shape': campaign_df.shape,
-                'original_naming_shape': naming_df.shape,
+                'original_campaign_shape': original_campaign_shape,
+                'original_naming_shape': original_naming_shape,
                 'processed_campaign_shape': processed_campaign_df.shape,
                 'processed_naming_shape': processed_naming_df.shape
             }
@@ -6,19 +6,76 @@ UNIFIED SNOWPARK APPROACH: Uses Snowpark for both local development and deployme
 No more SQLAlchemy dual code paths!
 """
 
+import functools
+import io
+import numpy as np
 import pandas as pd
 import logging
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import tempfile
 import os
+import shutil
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import time
+import uuid
+import weakref
+import streamlit as st
 from snowflake.snowpark import Session
-from snowpark_connection import get_snowpark_session
+from snowflake.snowpark.functions import current_timestamp
+from snowflake.snowpark.types import DoubleType, IntegerType, StringType, StructField, StructType
+from snowpark_connection import close_snowpark_sessions, get_snowpark_session, leased_snowpark_session
+import constants
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the app entry point (streamlit_app.py), not on import
 logger = logging.getLogger(__name__)
 
+# Number of non-null values sampled when inferring the Snowflake type of an object column
+TYPE_INFERENCE_SAMPLE_SIZE = 1000
+
+# dtype.kind -> Snowflake type for columns whose dtype already settles the type
+DTYPE_KIND_TO_SNOWFLAKE = {
+    'M': 'TIMESTAMP',
+    'i': 'INTEGER',
+    'u': 'INTEGER',
+    'f': 'FLOAT',
+    'b': 'BOOLEAN',
+}
+
+# Inferred Snowflake types per live DataFrame: id(df) -> {column: type}
+_inferred_types_cache: Dict[int, Dict[str, str]] = {}
+
+# MERGE sources are staged as Parquet under this prefix of the schema stage
+MERGE_STAGE_PREFIX = "merge"
+PARQUET_FILE_FORMAT_NAME = "PARQUET_FORMAT"
+# Threads the connector uses to upload chunks of a staged Parquet part
+PARQUET_PUT_PARALLEL = 8
+
+# Process-local cache of DESCRIBE TABLE results: (current database, table name) -> (expiry, columns)
+TABLE_COLUMNS_CACHE_TTL_SECONDS = 300
+_table_columns_cache: Dict[Tuple[str, str], Tuple[float, Set[str]]] = {}
+_table_columns_lock = threading.Lock()
+
+# (current database, schema) pairs whose Parquet file format has been ensured
+_parquet_formats_ready: Set[Tuple[str, str]] = set()
+
+# Seconds a cached read result stays valid across Streamlit reruns
+CACHED_QUERY_TTL_SECONDS = 300
+
+# PROCESSING_LOG columns supplied by callers (log_id and processing_timestamp are filled in)
+PROCESSING_LOG_SCHEMA = StructType([
+    StructField("WAVE_NUMBER", IntegerType()),
+    StructField("STATUS", StringType()),
+    StructField("RECORDS_PROCESSED", IntegerType()),
+    StructField("ERRORS_COUNT", IntegerType()),
+    StructField("WARNINGS_COUNT", IntegerType()),
+    StructField("PROCESSING_TIME_SECONDS", DoubleType()),
+    StructField("CLIENT_NAME", StringType()),
+    StructField("PLATFORM", StringType()),
+    StructField("YEAR", IntegerType()),
+])
+
 
 def get_snowflake_connection() -> Optional[Session]:
     """
@@ -27,12 +84,32 @@ def get_snowflake_connection() -> Optional[Session]:
     This replaces the old dual Snowpark/SQLAlchemy approach.
     Now uses Snowpark everywhere for simplicity.
 
+    Cheap to call on every rerun: the active session (in Snowflake) or the pooled,
+    health-checked local session is reused, so callers should not cache the result.
+
     Returns:
         Snowpark Session or None if connection fails
     """
     return get_snowpark_session()
 
 
+def leased_snowflake_connection():
+    """
+    Context manager yielding a Snowpark session (or None) that the local session pool
+    won't close until the block exits. Use it for long-running work such as uploads.
+    """
+    return leased_snowpark_session()
+
+
+def close_snowflake_connection() -> None:
+    """
+    Close the pooled local Snowpark sessions (e.g. at the end of a test run).
+
+    The active Streamlit-in-Snowflake session is not pooled and is left open.
+    """
+    close_snowpark_sessions()
+
+
 def infer_snowflake_type(series: pd.Series) -> str:
     """
     Infer Snowflake data type from pandas Series with intelligent type detection.
@@ -57,27 +134,39 @@ def infer_snowflake_type(series: pd.Series) -> str:
     if pd.api.types.is_bool_dtype(series):
         return 'BOOLEAN'
     
+    # Nullable string columns were typed upstream; don't re-probe them as numbers/dates
+    if series.dtype == 'string':
+        return 'STRING'
+    
     # For object/mixed columns, analyze the actual data
     non_null = series.dropna()
     if len(non_null) == 0:
         return 'STRING'
     
+    # Probe a fixed-seed sample first; only an ambiguous sample needs the full column
+    if len(non_null) > TYPE_INFERENCE_SAMPLE_SIZE:
+        sample = non_null.sample(TYPE_INFERENCE_SAMPLE_SIZE, random_state=0)
+    else:
+        sample = non_null
+    
     # Try converting to numeric
-    numeric_converted = pd.to_numeric(non_null, errors='coerce')
-    numeric_success_rate = numeric_converted.notna().sum() / len(non_null)
+    numeric_success_rate = pd.to_numeric(sample, errors='coerce').notna().mean()
+    if 0.5 < numeric_success_rate < 0.95 and len(sample) < len(non_null):
+        numeric_success_rate = pd.to_numeric(non_null, errors='coerce').notna().mean()
     
     # If >80% can be converted to numeric, treat as numeric
     if numeric_success_rate > 0.8:
-        # Check if all successful conversions are integers
-        successful_numeric = numeric_converted.dropna()
-        if len(successful_numeric) > 0:
-            is_integer = (successful_numeric == successful_numeric.astype(int)).all()
+        # INTEGER vs FLOAT is decided on every value so a late fractional value isn't truncated
+        values = pd.to_numeric(non_null, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if values.size > 0:
+            is_integer = np.array_equal(values, np.floor(values))
             return 'INTEGER' if is_integer else 'FLOAT'
     
-    # Try converting to datetime
+    # Try converting to datetime (sample only)
     try:
-        datetime_converted = pd.to_datetime(non_null, errors='coerce')
-        datetime_success_rate = datetime_converted.notna().sum() / len(non_null)
+        datetime_converted = pd.to_datetime(sample, errors='coerce')
+        datetime_success_rate = datetime_converted.notna().mean()
         if datetime_success_rate > 0.8:
             return 'TIMESTAMP'
     except:
@@ -87,9 +176,145 @@ def infer_snowflake_type(series: pd.Series) -> str:
     return 'STRING'
 
 
+def _cached_types(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Get the inferred-type cache for a DataFrame, creating it on first use.
+
+    Entries are keyed by id(df) and dropped when the DataFrame is garbage collected.
+
+    Args:
+        df: DataFrame whose cache to return
+
+    Returns:
+        Mutable dict of column name -> Snowflake type
+    """
+    key = id(df)
+    cached = _inferred_types_cache.get(key)
+    if cached is None:
+        cached = {}
+        _inferred_types_cache[key] = cached
+        weakref.finalize(df, _inferred_types_cache.pop, key, None)
+    return cached
+
+
+def infer_types_bulk(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Infer Snowflake types for several DataFrame columns in one pass.
+
+    Typed columns (including nullable extension dtypes) map straight from dtype.kind;
+    only object columns go through infer_snowflake_type. Results are cached per
+    DataFrame, so the dtype optimizer and expand_table_schema share them. The cache
+    assumes columns aren't modified in place between calls.
+
+    Args:
+        df: DataFrame to analyze
+        columns: Columns to infer (defaults to all columns)
+
+    Returns:
+        Dictionary of column name -> Snowflake data type
+    """
+    if columns is None:
+        columns = list(df.columns)
+    
+    cached = _cached_types(df)
+    for col in columns:
+        if col not in cached:
+            series = df[col]
+            cached[col] = DTYPE_KIND_TO_SNOWFLAKE.get(series.dtype.kind) or infer_snowflake_type(series)
+    
+    return {col: cached[col] for col in columns}
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a DataFrame's dtypes before staging it to Snowflake.
+    
+    Integer columns are downcast to the smallest integer type, and object columns
+    that infer_snowflake_type sees as INTEGER/FLOAT/TIMESTAMP are converted when
+    every non-null value converts cleanly. Floats are left at 64 bits to avoid
+    losing precision on spend metrics. Since expand_table_schema runs on the
+    optimized frame, converted columns short-circuit its type inference.
+    
+    Args:
+        df: DataFrame about to be uploaded
+        
+    Returns:
+        DataFrame with optimized dtypes (input is not modified)
+    """
+    converted = {}
+    object_columns = [col for col in df.columns if pd.api.types.is_object_dtype(df[col])]
+    inferred_types = infer_types_bulk(df, object_columns)
+    
+    for col in df.columns:
+        series = df[col]
+        
+        if pd.api.types.is_integer_dtype(series):
+            converted[col] = pd.to_numeric(series, downcast='integer')
+            continue
+        
+        if col not in inferred_types:
+            continue
+        
+        snowflake_type = inferred_types[col]
+        if snowflake_type == 'INTEGER':
+            typed = pd.to_numeric(series, errors='coerce', downcast='integer')
+        elif snowflake_type == 'FLOAT':
+            typed = pd.to_numeric(series, errors='coerce')
+        elif snowflake_type == 'TIMESTAMP':
+            typed = pd.to_datetime(series, errors='coerce')
+        else:
+            continue
+        
+        # Only keep conversions that don't turn any value into NULL
+        if typed.notna().sum() == series.notna().sum():
+            converted[col] = typed
+    
+    if not converted:
+        return df
+    
+    optimized = df.assign(**converted)
+    # Columns left as object keep their inferred type, so expand_table_schema reuses it
+    _cached_types(optimized).update(
+        {col: col_type for col, col_type in inferred_types.items() if col not in converted}
+    )
+    return optimized
+
+
+def _get_current_db(session: Session) -> str:
+    """
+    Get the session's current database.
+
+    Read from the connector, which tracks USE DATABASE from query responses, so this
+    needs no round trip and is never stale after a caller switches databases.
+
+    Args:
+        session: Snowpark session
+
+    Returns:
+        Current database name (unquoted, empty if none is set)
+    """
+    return (session.get_current_database() or '').strip('"')
+
+
+def _table_columns_key(table_name: str, session: Session) -> Tuple[str, str]:
+    """
+    DESCRIBE cache key: the same schema.table in another database is a different table.
+
+    Args:
+        table_name: Schema-qualified table name
+        session: Snowpark session
+
+    Returns:
+        Tuple of (current database, upper-cased table name)
+    """
+    return _get_current_db(session), table_name.upper()
+
+
 def get_table_columns(table_name: str, session: Session) -> set:
     """
     Get existing column names from a Snowflake table.
+    Results are cached per (current database, table) for TABLE_COLUMNS_CACHE_TTL_SECONDS;
+    call invalidate_table_columns after altering the table.
     
     Args:
         table_name: Fully qualified table name (schema.table)
@@ -98,23 +323,45 @@ def get_table_columns(table_name: str, session: Session) -> set:
     Returns:
         Set of column names (lowercase)
     """
+    cache_key = _table_columns_key(table_name, session)
+    with _table_columns_lock:
+        cached = _table_columns_cache.get(cache_key)
+    if cached is not None and cached[0] > time.monotonic():
+        return set(cached[1])
+
     try:
         result = session.sql(f"DESCRIBE TABLE {table_name}").collect()
         columns = {row[0].lower() for row in result}
-        logger.info(f"Table {table_name} has {len(columns)} columns")
-        return columns
+        logger.info("Table %s has %s columns", table_name, len(columns))
+        with _table_columns_lock:
+            _table_columns_cache[cache_key] = (time.monotonic() + TABLE_COLUMNS_CACHE_TTL_SECONDS, columns)
+        return set(columns)
         
     except Exception as e:
-        logger.error(f"Failed to get table columns: {e}")
+        logger.error("Failed to get table columns: %s", e)
         return set()
 
 
+def invalidate_table_columns(table_name: str) -> None:
+    """
+    Drop cached DESCRIBE TABLE results for a table (in every database).
+    
+    Args:
+        table_name: Fully qualified table name (schema.table)
+    """
+    table_key = table_name.upper()
+    with _table_columns_lock:
+        for cache_key in [k for k in _table_columns_cache if k[1] == table_key]:
+            del _table_columns_cache[cache_key]
+
+
 def expand_table_schema(
     table_name: str,
     df: pd.DataFrame,
     session: Session,
-    exclude_columns: set = None
-) -> Tuple[bool, str, int]:
+    exclude_columns: set = None,
+    existing_columns: Optional[set] = None
+) -> Tuple[bool, str, int, set]:
     """
     Dynamically expand table schema by adding new columns found in DataFrame.
     
@@ -123,67 +370,108 @@ def expand_table_schema(
         df: DataFrame with potentially new columns
         session: Snowpark Session
         exclude_columns: Set of columns to exclude from expansion (e.g., metadata columns)
+        existing_columns: Already-fetched table columns (lowercase); fetched if not provided
         
     Returns:
-        Tuple of (success: bool, message: str, columns_added: int)
+        Tuple of (success: bool, message: str, columns_added: int, table_columns: set)
+        where table_columns is the table's lowercase column set after expansion
     """
+    table_columns = set(existing_columns or ())
+    
     try:
         if exclude_columns is None:
             exclude_columns = set()
         
         # Get existing table columns
-        existing_columns = get_table_columns(table_name, session)
+        if existing_columns is None:
+            existing_columns = get_table_columns(table_name, session)
+        table_columns = set(existing_columns)
         
         if not existing_columns:
-            return False, f"Could not read schema for table {table_name}", 0
+            return False, f"Could not read schema for table {table_name}", 0, table_columns
+        
+        # Map lowercase names back to the DataFrame's casing (first occurrence wins)
+        lower_to_orig = {col.lower(): col for col in reversed(df.columns)}
         
         # Find new columns in DataFrame
-        df_columns = {col.lower() for col in df.columns}
+        df_columns = set(lower_to_orig)
         new_columns = df_columns - existing_columns - {col.lower() for col in exclude_columns}
         
         if not new_columns:
-            logger.info(f"No new columns to add to {table_name}")
-            return True, "Schema is up to date", 0
+            logger.info("No new columns to add to %s", table_name)
+            return True, "Schema is up to date", 0, table_columns
         
-        logger.info(f"Found {len(new_columns)} new columns to add: {new_columns}")
+        logger.info("Found %s new columns to add: %s", len(new_columns), new_columns)
         
-        # Add each new column
+        # Infer a Snowflake type for each new column in one pass (reuses optimize_dtypes results)
+        sorted_new_columns = sorted(new_columns)
+        new_column_types = infer_types_bulk(df, [lower_to_orig[col_name] for col_name in sorted_new_columns])
+        column_definitions = [
+            (col_name.upper(), new_column_types[lower_to_orig[col_name]])
+            for col_name in sorted_new_columns
+        ]
+        
+        # Add all new columns in a single ALTER TABLE statement
         columns_added = 0
+        alter_failed = False
+        alter_sql = f"ALTER TABLE {table_name} ADD COLUMN " + ', '.join(
+            f"{col} {col_type}" for col, col_type in column_definitions
+        )
         
-        for col_name in new_columns:
-            # Find the original case column name from df
-            original_col = next((c for c in df.columns if c.lower() == col_name), col_name)
-            
-            # Infer data type from DataFrame
-            snowflake_type = infer_snowflake_type(df[original_col])
+        try:
+            logger.info("Adding columns: %s", alter_sql)
+            session.sql(alter_sql).collect()
+            columns_added = len(column_definitions)
+            table_columns.update(col.lower() for col, _ in column_definitions)
+            logger.info("Successfully added %s column(s): %s", columns_added, column_definitions)
             
-            # Generate ALTER TABLE statement
-            alter_sql = f"ALTER TABLE {table_name} ADD COLUMN {col_name.upper()} {snowflake_type}"
+        except Exception as batch_error:
+            # Fall back to one column at a time so a single bad column doesn't block the rest
+            logger.warning("Batched ALTER TABLE failed (%s), adding columns individually", batch_error)
             
-            try:
-                logger.info(f"Adding column: {alter_sql}")
-                session.sql(alter_sql).collect()
-                columns_added += 1
-                logger.info(f"Successfully added column {col_name.upper()} ({snowflake_type})")
+            for col, col_type in column_definitions:
+                alter_sql = f"ALTER TABLE {table_name} ADD COLUMN {col} {col_type}"
                 
-            except Exception as col_error:
-                logger.error(f"Failed to add column {col_name}: {col_error}")
-                # Continue with other columns even if one fails
+                try:
+                    logger.info("Adding column: %s", alter_sql)
+                    session.sql(alter_sql).collect()
+                    columns_added += 1
+                    table_columns.add(col.lower())
+                    logger.info("Successfully added column %s (%s)", col, col_type)
+                    
+                except Exception as col_error:
+                    alter_failed = True
+                    logger.error("Failed to add column %s: %s", col, col_error)
+                    # Continue with other columns even if one fails
+        
+        if alter_failed:
+            # The cached columns may be stale (e.g. another process already added one):
+            # re-read the table so the upload keeps every column that now exists
+            invalidate_table_columns(table_name)
+            table_columns = get_table_columns(table_name, session) or table_columns
+        elif columns_added > 0:
+            invalidate_table_columns(table_name)
+            # Every column went in, so the column set is known without another DESCRIBE
+            with _table_columns_lock:
+                _table_columns_cache[_table_columns_key(table_name, session)] = (
+                    time.monotonic() + TABLE_COLUMNS_CACHE_TTL_SECONDS, set(table_columns)
+                )
         
         message = f"Successfully added {columns_added} new column(s) to {table_name}"
         logger.info(message)
-        return True, message, columns_added
+        return True, message, columns_added, table_columns
         
     except Exception as e:
-        logger.error(f"Schema expansion failed: {e}")
-        return False, f"Schema expansion error: {str(e)}", 0
+        logger.error("Schema expansion failed: %s", e)
+        return False, f"Schema expansion error: {str(e)}", 0, table_columns
 
 
 def create_schema_and_tables(
     client_name: str,
     platform: str,
     year: int,
-    conn = None
+    conn = None,
+    transient: bool = False
 ) -> Tuple[bool, str, str]:
     """
     Create schema, stage, and platform-specific tables using sql_templates.py.
@@ -196,6 +484,8 @@ def create_schema_and_tables(
         platform: Platform name (e.g., 'meta')
         year: Year (e.g., 2024)
         conn: Optional Snowflake connection (will create if not provided)
+        transient: Create a transient schema with 0-day retention (e.g. for tests);
+            has no effect on a schema that already exists
 
     Returns:
         Tuple of (success: bool, schema_name: str, message: str)
@@ -213,29 +503,58 @@ def create_schema_and_tables(
                 return False, schema_name, "Failed to establish Snowflake connection"
 
         # Generate all SQL statements with platform parameter
-        statements = generate_schema_creation_statements(schema_name, platform)
-
-        # Execute statements in order
-        execution_order = [
-            'create_schema',
-            'create_stage',
-            'create_naming_keys_table',
-            'create_processed_campaign_data_table',
-            'create_processing_log_table'
+        statements = generate_schema_creation_statements(schema_name, platform, transient)
+
+        # Preferred path: submit every statement in a single multi-statement request;
+        # MULTI_STATEMENT_COUNT is a statement parameter, so the session itself is untouched
+        try:
+            logger.info("Executing batched DDL for platform %s", platform.upper())
+            conn.sql(statements['batch']).collect(
+                statement_params={"MULTI_STATEMENT_COUNT": 0}
+            )
+            _parquet_formats_ready.add(_parquet_format_key(schema_name, conn))
+            logger.info("Successfully created schema %s with %s tables", schema_name, platform.upper())
+            return True, schema_name, f"Schema {schema_name} created with {platform.upper()} tables"
+        except Exception as batch_error:
+            # Every statement is IF NOT EXISTS, so re-running them individually is safe
+            logger.warning("Batched DDL failed (%s), executing statements individually", batch_error)
+
+        # The schema must exist first; after that the statements are independent and
+        # run concurrently (statements inside a group would run in order)
+        statement_groups = [
+            ['create_stage'],
+            ['create_parquet_file_format'],
+            ['create_naming_keys_table'],
+            ['create_processed_campaign_data_table'],
+            ['create_processing_log_table']
         ]
 
-        # Execute using Snowpark (works in both deployed and local environments)
-        for statement_key in execution_order:
-            if statement_key in statements:
-                sql = statements[statement_key]
-                logger.info(f"Executing: {statement_key} for platform {platform.upper()}")
-                conn.sql(sql).collect()
+        def execute_statements(statement_keys):
+            # Execute using Snowpark (works in both deployed and local environments)
+            for statement_key in statement_keys:
+                if statement_key in statements:
+                    logger.info("Executing: %s for platform %s", statement_key, platform.upper())
+                    conn.sql(statements[statement_key]).collect()
 
-        logger.info(f"Successfully created schema {schema_name} with {platform.upper()} tables")
+        execute_statements(['create_schema'])
+
+        with ThreadPoolExecutor(max_workers=len(statement_groups)) as executor:
+            futures = [executor.submit(execute_statements, group) for group in statement_groups]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in not_done:
+                future.cancel()
+
+        errors = [str(future.exception()) for future in done if future.exception() is not None]
+        if errors:
+            logger.error("Failed to create tables in %s: %s", schema_name, errors)
+            return False, schema_name, f"Error: {'; '.join(errors)}"
+
+        _parquet_formats_ready.add(_parquet_format_key(schema_name, conn))
+        logger.info("Successfully created schema %s with %s tables", schema_name, platform.upper())
         return True, schema_name, f"Schema {schema_name} created with {platform.upper()} tables"
 
     except Exception as e:
-        logger.error(f"Failed to create schema and tables: {e}")
+        logger.error("Failed to create schema and tables: %s", e)
         return False, schema_name, f"Error: {str(e)}"
 
 
@@ -269,7 +588,7 @@ def rename_uploaded_file(
 
     standardized_name = f"{client_clean}_{platform_clean}_{year}_wave{wave_number}_{file_type}.csv"
 
-    logger.info(f"Renamed '{original_filename}' to '{standardized_name}'")
+    logger.info("Renamed '%s' to '%s'", original_filename, standardized_name)
     return standardized_name
 
 
@@ -290,45 +609,239 @@ def save_renamed_file(uploaded_file, renamed_filename: str, output_dir: Optional
 
     output_path = os.path.join(output_dir, renamed_filename)
 
-    # Handle Streamlit UploadedFile
+    # Handle Streamlit UploadedFile: stream in 1 MB chunks rather than materializing getvalue()
     if hasattr(uploaded_file, 'getvalue'):
+        uploaded_file.seek(0)
         with open(output_path, 'wb') as f:
-            f.write(uploaded_file.getvalue())
+            shutil.copyfileobj(uploaded_file, f, length=constants.COPY_CHUNK_SIZE_BYTES)
     # Handle file path string
     elif isinstance(uploaded_file, str):
-        import shutil
         shutil.copy2(uploaded_file, output_path)
     else:
         raise ValueError(f"Unsupported file type: {type(uploaded_file)}")
 
-    logger.info(f"Saved file to: {output_path}")
+    logger.info("Saved file to: %s", output_path)
     return output_path
 
 
-def populate_naming_keys_table(
+def _parquet_format_key(schema_name: str, session: Session) -> Tuple[str, str]:
+    """
+    _parquet_formats_ready key: the format lives in a schema of the current database.
+
+    Args:
+        schema_name: Schema name
+        session: Snowpark session
+
+    Returns:
+        Tuple of (current database, upper-cased schema name)
+    """
+    return _get_current_db(session), schema_name.upper()
+
+
+def _ensure_parquet_file_format(schema_name: str, session: Session, force: bool = False) -> None:
+    """
+    Create the schema's Parquet file format once per database and schema.
+
+    Schemas created before the format was added to the templates won't have it yet.
+
+    Args:
+        schema_name: Schema name
+        session: Snowpark session
+        force: Run the CREATE even if the format was already ensured (e.g. it was dropped)
+    """
+    from sql_templates import generate_parquet_file_format_statement
+
+    key = _parquet_format_key(schema_name, session)
+    if key in _parquet_formats_ready and not force:
+        return
+    session.sql(generate_parquet_file_format_statement(schema_name)).collect()
+    _parquet_formats_ready.add(key)
+
+
+def _stage_parquet_for_merge(
+    df: pd.DataFrame,
+    columns: List[str],
+    schema_name: str,
+    file_stem: str,
+    session: Session
+) -> str:
+    """
+    Write a DataFrame as Parquet files on the schema stage.
+
+    Rows are split into files of constants.SNOWFLAKE_BATCH_SIZE rows so the
+    warehouse can scan them in parallel. Each call stages into its own directory,
+    so parts left over from an earlier failed upload are never read. Only one
+    batch of the selected columns is copied out of df and serialized at a time.
+    Parts are uploaded from memory with put_stream, like upload_csv_to_stage,
+    since PUT of local files isn't available in the Streamlit-in-Snowflake runtime.
+
+    Args:
+        df: Rows to stage
+        columns: Columns of df to write
+        schema_name: Schema whose stage receives the files
+        file_stem: Staged directory name prefix
+        session: Snowpark session
+
+    Returns:
+        Staged directory path (e.g. @SCHEMA.SCHEMA_STAGE/merge/META_NAMING_KEYS_1_1a2b3c4d/)
+    """
+    _ensure_parquet_file_format(schema_name, session)
+
+    batch_size = max(constants.SNOWFLAKE_BATCH_SIZE, 1)
+    stage_dir = (
+        f"@{schema_name}.{schema_name}_STAGE/{MERGE_STAGE_PREFIX}/"
+        f"{file_stem}_{uuid.uuid4().hex[:8]}/"
+    )
+
+    for part, start in enumerate(range(0, len(df), batch_size)):
+        buffer = io.BytesIO()
+        df.iloc[start:start + batch_size][columns].to_parquet(
+            buffer,
+            engine='pyarrow',
+            compression='snappy',
+            index=False,
+            coerce_timestamps='us',
+            allow_truncated_timestamps=True
+        )
+        buffer.seek(0)
+        session.file.put_stream(
+            buffer,
+            f"{stage_dir}part_{part:05d}.parquet",
+            parallel=PARQUET_PUT_PARALLEL,
+            auto_compress=False,
+            overwrite=True
+        )
+
+    logger.info("Staged %s rows to %s", len(df), stage_dir)
+    return stage_dir
+
+
+def _remove_staged_file(staged_file: str, session: Session) -> None:
+    """
+    Remove staged MERGE source files, logging instead of raising on failure.
+
+    Args:
+        staged_file: Staged directory path returned by _stage_parquet_for_merge
+        session: Snowpark session
+    """
+    try:
+        session.sql(f"REMOVE {staged_file}").collect()
+        logger.info("Removed staged files: %s", staged_file)
+    except Exception as remove_error:
+        logger.warning("Failed to remove staged files %s: %s", staged_file, remove_error)
+
+
+def _parquet_cast_type(series: pd.Series) -> str:
+    """
+    Snowflake type to cast a staged Parquet field to, based on the column's dtype.
+
+    Args:
+        series: Column that was written to Parquet
+
+    Returns:
+        Snowflake data type as string
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'TIMESTAMP_NTZ'
+    if pd.api.types.is_bool_dtype(series):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(series):
+        return 'FLOAT'
+    return 'STRING'
+
+
+def _build_parquet_source_query(
+    df: pd.DataFrame,
+    columns: List[str],
+    staged_file: str,
+    file_format: str
+) -> str:
+    """
+    Build a SELECT over staged Parquet files that exposes each DataFrame column.
+
+    Columns are aliased with their exact (quoted) names so MERGE can reference source."col".
+
+    Args:
+        df: DataFrame that was staged
+        columns: Columns of df that were written
+        staged_file: Staged file or directory path
+        file_format: Fully qualified Parquet file format name
+
+    Returns:
+        SELECT statement reading the staged file
+    """
+    select_list = ', '.join(
+        f'$1:"{col}"::{_parquet_cast_type(df[col])} AS "{col}"' for col in columns
+    )
+    return f"SELECT {select_list} FROM {staged_file} (FILE_FORMAT => '{file_format}')"
+
+
+@functools.lru_cache(maxsize=64)
+def _build_merge_clauses(columns: Tuple[str, ...], primary_key: str) -> Tuple[str, str, str]:
+    """
+    Build the UPDATE SET, INSERT column and INSERT VALUES clauses of a MERGE.
+
+    Cached on the column tuple, so repeat uploads with the same columns skip the joins;
+    a new column produces a new key. Both sides are quoted: target columns were created
+    unquoted and so are stored uppercase, while source columns keep the DataFrame's case.
+
+    Args:
+        columns: Sorted column names present in both the DataFrame and the table
+        primary_key: MERGE key column, excluded from UPDATE SET
+
+    Returns:
+        Tuple of (update_set_clause, insert_columns, insert_values)
+    """
+    update_set, insert_columns, insert_values = [], [], []
+    for col in columns:
+        target_col = f'"{col.upper()}"'
+        source_col = f'source."{col}"'
+        insert_columns.append(target_col)
+        insert_values.append(source_col)
+        if col.lower() != primary_key:
+            update_set.append(f'target.{target_col} = {source_col}')
+    return ', '.join(update_set), ', '.join(insert_columns), ', '.join(insert_values)
+
+
+def _populate_upsert_via_merge(
     df: pd.DataFrame,
     schema_name: str,
     platform: str,
     wave_number: int,
-    conn = None
+    conn,
+    table_suffix: str,
+    primary_key: str,
+    data_label: str
 ) -> Tuple[bool, str]:
     """
-    Populate platform-prefixed naming_keys table with UPSERT logic.
-    ON CONFLICT (ad_set_name) DO UPDATE.
+    Upsert a DataFrame into a platform-prefixed table with a MERGE on its primary key.
 
-    NEW STRUCTURE: Uses platform-prefixed table names.
-    Example: CLIENT_CATERPILLAR_2024.META_NAMING_KEYS
+    Shared by populate_naming_keys_table and populate_campaign_data_table, which
+    differ only in the table suffix and primary key.
 
     Args:
-        df: Processed naming keys DataFrame
+        df: Processed DataFrame to upsert
         schema_name: Target schema name (e.g., CLIENT_CATERPILLAR_2024)
         platform: Platform name (e.g., 'meta')
         wave_number: Wave number
-        conn: Snowflake connection
+        conn: Snowflake connection (will create if None)
+        table_suffix: Table name after the platform prefix (e.g., 'NAMING_KEYS')
+        primary_key: MERGE key column (e.g., 'ad_set_name')
+        data_label: Data name used in messages (e.g., 'naming key', 'campaign')
 
     Returns:
         Tuple of (success: bool, message: str)
     """
+    # Nothing to upsert: skip the schema check, staging and MERGE round trips
+    if len(df) == 0:
+        logger.info("No %s rows to upsert for wave %s", data_label, wave_number)
+        return True, "No rows to upsert"
+
+    # Platform-prefixed table name
+    table_name = f"{platform.upper()}_{table_suffix}"
+
     try:
         # Get connection if not provided
         if conn is None:
@@ -336,36 +849,32 @@ def populate_naming_keys_table(
             if conn is None:
                 return False, "Failed to establish Snowflake connection"
 
-        warning_msg = None
-
-        # Ensure wave_number column exists
+        # Ensure wave_number column exists and add upload timestamp without mutating the caller's frame
+        added_columns = {}
         if 'wave_number' not in df.columns:
-            df['wave_number'] = wave_number
+            added_columns['wave_number'] = wave_number
+        added_columns['upload_timestamp'] = datetime.now()
 
-        # Add upload timestamp
-        df['upload_timestamp'] = datetime.now()
+        # Downcast dtypes once so schema expansion and the upload share the typed columns
+        df = optimize_dtypes(df.assign(**added_columns))
 
-        # Platform-prefixed table name
-        prefix = platform.upper()
-        naming_keys_table = f"{prefix}_NAMING_KEYS"
-        full_table_name_for_schema = f"{schema_name}.{naming_keys_table}"
+        full_table_name_for_schema = f"{schema_name}.{table_name}"
         
-        # SCHEMA EXPANSION: Check and add new columns if found
-        logger.info(f"Checking schema for new columns in {full_table_name_for_schema}")
-        expand_success, expand_msg, cols_added = expand_table_schema(
+        # SCHEMA EXPANSION: Check and add new columns if found (one DESCRIBE shared with expansion)
+        logger.info("Checking schema for new columns in %s", full_table_name_for_schema)
+        existing_columns = get_table_columns(full_table_name_for_schema, conn)
+        expand_success, expand_msg, cols_added, existing_columns = expand_table_schema(
             full_table_name_for_schema,
             df,
             conn,
-            exclude_columns={'upload_timestamp'}  
+            exclude_columns={'upload_timestamp'},
+            existing_columns=existing_columns
         )
         
         if cols_added > 0:
-            logger.info(f"Schema expanded: {expand_msg}")
+            logger.info("Schema expanded: %s", expand_msg)
         elif not expand_success:
-            logger.warning(f"Schema expansion check failed: {expand_msg}")
-
-        # Refresh table columns after schema expansion
-        existing_columns = get_table_columns(full_table_name_for_schema, conn)
+            logger.warning("Schema expansion check failed: %s", expand_msg)
 
         # Use only columns present in both DataFrame and table
         filtered_columns = [col for col in df.columns if col.lower() in existing_columns]
@@ -374,91 +883,76 @@ def populate_naming_keys_table(
         warning_msg = None
         if missing_for_upload:
             warning_msg = (
-                "⚠️ Naming data is missing %d column(s) present in Snowflake table: %s. "
+                "⚠️ %s data is missing %d column(s) present in Snowflake table: %s. "
                 "Existing rows keep old values, new rows will have NULLs for these columns."
-            ) % (len(missing_for_upload), missing_for_upload)
+            ) % (data_label.capitalize(), len(missing_for_upload), missing_for_upload)
             logger.warning(warning_msg)
 
         if not filtered_columns:
-            return False, "No matching columns between uploaded naming data and table schema"
-
-        df_filtered = df[filtered_columns].copy()
-
-        # Snowpark: write DataFrame to temp table within target schema
-        temp_table_unqualified = f"{prefix}_NAMING_KEYS_TEMP_{wave_number}"
-
-        # Determine current database and fully qualify all table references
-        _db_row = conn.sql("SELECT CURRENT_DATABASE() AS DB").collect()[0]
-        current_db = _db_row[0] if isinstance(_db_row, (list, tuple)) else _db_row["DB"]
-
-        full_temp_table = f"{current_db}.{schema_name}.{temp_table_unqualified}"
-        full_table_name = f"{current_db}.{schema_name}.{naming_keys_table}"
-
-        logger.info(f"Creating temp table: {full_temp_table}")
-
-        # Create Snowpark DataFrame and save into the target schema explicitly
-        sp_df = conn.create_dataframe(df_filtered)
-        sp_df.write.save_as_table(full_temp_table, mode="overwrite")
+            return False, f"No matching columns between uploaded {data_label} data and table schema"
 
-        logger.info("Temp table created successfully")
+        # Stage the rows as Parquet files so MERGE can read them straight from the stage
+        merge_file_stem = f"{table_name}_{wave_number}"
 
-        # Generate MERGE statement dynamically based on actual columns
-        # Note: Snowpark DataFrames preserve column case, so we use exact case from df_filtered
-        all_columns = df_filtered.columns.tolist()
+        # Resolve the target in the current database, like the DESCRIBE/ALTER/stage above
+        full_table_name = full_table_name_for_schema
 
-        # Build UPDATE SET clause (exclude primary key)
-        update_columns = [col for col in all_columns if col.lower() != 'ad_set_name']
-        update_set_clause = ', '.join([f'{col} = source."{col}"' for col in update_columns])
+        staged_file = _stage_parquet_for_merge(df, filtered_columns, schema_name, merge_file_stem, conn)
+        source_query = _build_parquet_source_query(
+            df, filtered_columns, staged_file, f"{schema_name}.{PARQUET_FILE_FORMAT_NAME}"
+        )
 
-        # Build INSERT clause
-        insert_columns = ', '.join(all_columns)
-        insert_values = ', '.join([f'source."{col}"' for col in all_columns])
+        # Generate MERGE clauses from the column set (cached across uploads of the same shape)
+        update_set_clause, insert_columns, insert_values = _build_merge_clauses(
+            tuple(sorted(filtered_columns)), primary_key
+        )
 
         merge_sql = f"""
             MERGE INTO {full_table_name} AS target
-            USING {full_temp_table} AS source
-            ON target.ad_set_name = source."ad_set_name"
+            USING ({source_query}) AS source
+            ON target."{primary_key.upper()}" = source."{primary_key}"
             WHEN MATCHED THEN UPDATE SET {update_set_clause}
             WHEN NOT MATCHED THEN INSERT ({insert_columns})
                 VALUES ({insert_values})
         """
 
-        logger.info("Executing MERGE statement")
-        # logger.info(f"MERGE SQL: {merge_sql[:500]}...")
+        logger.info("Executing MERGE statement for %s", full_table_name)
 
         # Execute MERGE with error handling and guaranteed cleanup
         try:
-            conn.sql(merge_sql).collect()
+            try:
+                conn.sql(merge_sql).collect()
+            except Exception as format_error:
+                if 'file format' not in str(format_error).lower():
+                    raise
+                # The format was dropped after it was ensured: recreate it and retry once
+                logger.warning("Parquet file format missing, recreating it: %s", format_error)
+                _ensure_parquet_file_format(schema_name, conn, force=True)
+                conn.sql(merge_sql).collect()
             logger.info("MERGE completed successfully")
         except Exception as merge_error:
-            logger.error(f"MERGE failed: {merge_error}")
-            logger.error(f"Full MERGE SQL: {merge_sql}")
+            logger.error("MERGE failed: %s", merge_error)
+            logger.error("Full MERGE SQL: %s", merge_sql)
             raise
         finally:
-            # Always drop temp table, even if MERGE fails
-            try:
-                conn.sql(f"DROP TABLE IF EXISTS {full_temp_table}").collect()
-                logger.info(f"Dropped temp table: {full_temp_table}")
-            except Exception as drop_error:
-                logger.warning(f"Failed to drop temp table {full_temp_table}: {drop_error}")
+            # Always remove the staged file, even if MERGE fails
+            _remove_staged_file(staged_file, conn)
 
-        result_message = f"Inserted/Updated {len(df_filtered)} naming key records"
+        result_message = f"Inserted/Updated {len(df)} {data_label} records"
         if warning_msg:
             result_message = f"{result_message} | {warning_msg}"
 
-        logger.info(f"Successfully populated naming_keys table with {len(df_filtered)} records")
+        logger.info("Successfully populated %s with %s records", table_name, len(df))
         return True, result_message
 
     except Exception as e:
-        logger.error(f"Failed to populate naming_keys table: {e}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        logger.error(f"Exception details: {repr(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Failed to populate %s table: %s", table_name, e)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Exception details: %r", e, exc_info=True)
         return False, f"Error: {str(e)}"
 
 
-def populate_campaign_data_table(
+def populate_naming_keys_table(
     df: pd.DataFrame,
     schema_name: str,
     platform: str,
@@ -466,14 +960,14 @@ def populate_campaign_data_table(
     conn = None
 ) -> Tuple[bool, str]:
     """
-    Populate platform-prefixed processed_campaign_data table with UPSERT logic.
-    ON CONFLICT (ad_name) DO UPDATE.
+    Populate platform-prefixed naming_keys table with UPSERT logic.
+    One MERGE keyed on ad_set_name: matched rows are updated, new rows inserted.
 
     NEW STRUCTURE: Uses platform-prefixed table names.
-    Example: CLIENT_CATERPILLAR_2024.META_PROCESSED_CAMPAIGN_DATA
+    Example: CLIENT_CATERPILLAR_2024.META_NAMING_KEYS
 
     Args:
-        df: Processed campaign data DataFrame
+        df: Processed naming keys DataFrame
         schema_name: Target schema name (e.g., CLIENT_CATERPILLAR_2024)
         platform: Platform name (e.g., 'meta')
         wave_number: Wave number
@@ -482,128 +976,40 @@ def populate_campaign_data_table(
     Returns:
         Tuple of (success: bool, message: str)
     """
-    try:
-        # Get connection if not provided
-        if conn is None:
-            conn = get_snowflake_connection()
-            if conn is None:
-                return False, "Failed to establish Snowflake connection"
-
-        # Ensure wave_number column exists
-        if 'wave_number' not in df.columns:
-            df['wave_number'] = wave_number
-
-        # Add upload timestamp
-        df['upload_timestamp'] = datetime.now()
+    return _populate_upsert_via_merge(
+        df, schema_name, platform, wave_number, conn,
+        table_suffix="NAMING_KEYS", primary_key="ad_set_name", data_label="naming key"
+    )
 
-        # Platform-prefixed table name
-        prefix = platform.upper()
-        campaign_data_table = f"{prefix}_PROCESSED_CAMPAIGN_DATA"
-        full_table_name_for_schema = f"{schema_name}.{campaign_data_table}"
-        
-        # SCHEMA EXPANSION: Check and add new columns if found
-        logger.info(f"Checking schema for new columns in {full_table_name_for_schema}")
-        expand_success, expand_msg, cols_added = expand_table_schema(
-            full_table_name_for_schema,
-            df,
-            conn,
-            exclude_columns={'upload_timestamp'}  # Exclude metadata columns from expansion check
-        )
-        
-        if cols_added > 0:
-            logger.info(f"Schema expanded: {expand_msg}")
-        elif not expand_success:
-            logger.warning(f"Schema expansion check failed: {expand_msg}")
-
-        # Refresh table columns after schema expansion
-        existing_columns = get_table_columns(full_table_name_for_schema, conn)
-
-        # Use only columns present in both DataFrame and table
-        filtered_columns = [col for col in df.columns if col.lower() in existing_columns]
-        missing_for_upload = [col for col in df.columns if col.lower() not in existing_columns]
-
-        warning_msg = None
-        if missing_for_upload:
-            warning_msg = (
-                "⚠️ Campaign data is missing %d column(s) present in Snowflake table: %s. "
-                "Existing rows keep old metrics, new rows will have NULLs."
-            ) % (len(missing_for_upload), missing_for_upload)
-            logger.warning(warning_msg)
-
-        if not filtered_columns:
-            return False, "No matching columns between uploaded campaign data and table schema"
-
-        df_filtered = df[filtered_columns].copy()
-
-        # Snowpark session: create temp table within target schema
-        temp_table_unqualified = f"{prefix}_CAMPAIGN_DATA_TEMP_{wave_number}"
-
-        # Determine current database and fully qualify all table references
-        _db_row = conn.sql("SELECT CURRENT_DATABASE() AS DB").collect()[0]
-        current_db = _db_row[0] if isinstance(_db_row, (list, tuple)) else _db_row["DB"]
-
-        full_temp_table = f"{current_db}.{schema_name}.{temp_table_unqualified}"
-        full_table_name = f"{current_db}.{schema_name}.{campaign_data_table}"
-
-        logger.info(f"Creating campaign temp table: {full_temp_table}")
 
-        # Create Snowpark DataFrame and save into the target schema explicitly
-        sp_df = conn.create_dataframe(df_filtered)
-        sp_df.write.save_as_table(full_temp_table, mode="overwrite")
-        
-        logger.info("Campaign temp table created successfully")
-
-        # Build UPDATE SET clause dynamically (exclude primary key) with quoted column names
-        all_columns = df_filtered.columns.tolist()
-        update_columns = [col for col in all_columns if col.lower() != 'ad_name']
-        update_set_clause = ', '.join([f'{col} = source."{col}"' for col in update_columns])
-
-        # Build INSERT clause dynamically with quoted column names
-        insert_columns = ', '.join(all_columns)
-        insert_values = ', '.join([f'source."{col}"' for col in all_columns])
-
-        # Generate MERGE statement with fully qualified names and quoted column references
-        merge_sql = f"""
-        MERGE INTO {full_table_name} AS target
-        USING {full_temp_table} AS source
-        ON target.ad_name = source."ad_name"
-        WHEN MATCHED THEN UPDATE SET {update_set_clause}
-        WHEN NOT MATCHED THEN INSERT ({insert_columns})
-            VALUES ({insert_values})
-        """
-
-        logger.info("Executing campaign MERGE statement")
-        
-        # Execute MERGE with error handling and guaranteed cleanup
-        try:
-            conn.sql(merge_sql).collect()
-            logger.info("Campaign MERGE completed successfully")
-        except Exception as merge_error:
-            logger.error(f"Campaign MERGE failed: {merge_error}")
-            logger.error(f"Full MERGE SQL: {merge_sql}")
-            raise
-        finally:
-            # Always drop temp table, even if MERGE fails
-            try:
-                conn.sql(f"DROP TABLE IF EXISTS {full_temp_table}").collect()
-                logger.info(f"Dropped temp table: {full_temp_table}")
-            except Exception as drop_error:
-                logger.warning(f"Failed to drop temp table {full_temp_table}: {drop_error}")
+def populate_campaign_data_table(
+    df: pd.DataFrame,
+    schema_name: str,
+    platform: str,
+    wave_number: int,
+    conn = None
+) -> Tuple[bool, str]:
+    """
+    Populate platform-prefixed processed_campaign_data table with UPSERT logic.
+    One MERGE keyed on ad_name: matched rows are updated, new rows inserted.
 
-        result_message = f"Inserted/Updated {len(df_filtered)} campaign data records"
-        if warning_msg:
-            result_message = f"{result_message} | {warning_msg}"
+    NEW STRUCTURE: Uses platform-prefixed table names.
+    Example: CLIENT_CATERPILLAR_2024.META_PROCESSED_CAMPAIGN_DATA
 
-        logger.info(f"Successfully populated campaign_data table with {len(df_filtered)} records")
-        return True, result_message
+    Args:
+        df: Processed campaign data DataFrame
+        schema_name: Target schema name (e.g., CLIENT_CATERPILLAR_2024)
+        platform: Platform name (e.g., 'meta')
+        wave_number: Wave number
+        conn: Snowflake connection
 
-    except Exception as e:
-        logger.error(f"Failed to populate campaign_data table: {e}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        logger.error(f"Exception details: {repr(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return False, f"Error: {str(e)}"
+    Returns:
+        Tuple of (success: bool, message: str)
+    """
+    return _populate_upsert_via_merge(
+        df, schema_name, platform, wave_number, conn,
+        table_suffix="PROCESSED_CAMPAIGN_DATA", primary_key="ad_name", data_label="campaign"
+    )
 
 
 def upload_csv_to_stage(
@@ -644,38 +1050,37 @@ def upload_csv_to_stage(
             uploaded_file.name, wave_number, client_name, platform, year, file_type
         )
 
-        # Save file to temp location
-        temp_path = save_renamed_file(uploaded_file, standardized_filename)
-
         # Stage name
         stage_name = f"{schema_name}.{schema_name}_stage"
 
-        # Use Snowpark file API when available; PUT is not supported in Streamlit runtime
-        has_file_api = hasattr(conn, 'file') and hasattr(getattr(conn, 'file'), 'put')
+        # Use Snowpark file API when available; PUT of local files is not supported in Streamlit runtime
+        has_file_api = hasattr(conn, 'file') and hasattr(getattr(conn, 'file'), 'put_stream')
 
         if has_file_api:
-            # Snowpark session in Snowflake (Streamlit): use session.file.put
-            stage_location = f"@{stage_name}"
-            conn.file.put(
-                local_file_name=temp_path,
-                stage_location=stage_location,
-                overwrite=True,
-                auto_compress=False
+            # Snowpark session: stream the upload straight to the stage, no local copy
+            uploaded_file.seek(0)
+            conn.file.put_stream(
+                uploaded_file,
+                f"@{stage_name}/{standardized_filename}",
+                auto_compress=False,
+                overwrite=True
             )
         else:
-            # Fallback for Snowpark-like sessions: execute PUT via SQL (works in local dev)
-            put_sql = f"PUT file://{temp_path} @{stage_name} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
-            conn.sql(put_sql).collect()
-
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-        logger.info(f"Successfully uploaded {standardized_filename} to stage {stage_name}")
+            # Fallback for Snowpark-like sessions: PUT needs a local file:// path (works in local dev)
+            temp_path = save_renamed_file(uploaded_file, standardized_filename)
+            try:
+                put_sql = f"PUT file://{temp_path} @{stage_name} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+                conn.sql(put_sql).collect()
+            finally:
+                # Clean up temp file
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+
+        logger.info("Successfully uploaded %s to stage %s", standardized_filename, stage_name)
         return True, f"Uploaded {standardized_filename} to stage"
 
     except Exception as e:
-        logger.error(f"Failed to upload file to stage: {e}")
+        logger.error("Failed to upload file to stage: %s", e)
         return False, f"Error uploading to stage: {str(e)}"
 
 
@@ -716,35 +1121,44 @@ def create_audience_ad_descriptor_view(
 
         # Verify that source tables exist before creating view
         prefix = platform.upper()
-        campaign_table = f"{schema_name}.{prefix}_PROCESSED_CAMPAIGN_DATA"
-        naming_table = f"{schema_name}.{prefix}_NAMING_KEYS"
+        source_tables = {f"{prefix}_PROCESSED_CAMPAIGN_DATA", f"{prefix}_NAMING_KEYS"}
 
         logger.info("Verifying source tables exist for view creation")
 
         try:
-            # Verify tables exist
-            conn.sql(f"SELECT 1 FROM {campaign_table} LIMIT 1").collect()
-            conn.sql(f"SELECT 1 FROM {naming_table} LIMIT 1").collect()
+            # Metadata-only lookup; unquoted identifiers are stored uppercase
+            rows = conn.sql(
+                "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES "
+                "WHERE TABLE_SCHEMA = ? AND TABLE_NAME IN (?, ?)",
+                params=[schema_name.upper(), *sorted(source_tables)]
+            ).collect()
         except Exception as e:
             error_msg = f"Source tables do not exist or are not accessible: {e}"
             logger.error(error_msg)
             return False, error_msg
 
-        # Generate view creation SQL
-        view_sql = generate_view_creation_statement(schema_name, platform)
-        logger.info(f"Creating view: {full_view_name}")
+        missing_tables = source_tables - {row[0] for row in rows}
+        if missing_tables:
+            error_msg = f"Source tables do not exist or are not accessible: {sorted(missing_tables)}"
+            logger.error(error_msg)
+            return False, error_msg
+
+        # Generate view creation SQL; columns added by schema expansion are listed too
+        campaign_columns = get_table_columns(f"{schema_name}.{prefix}_PROCESSED_CAMPAIGN_DATA", conn)
+        view_sql = generate_view_creation_statement(
+            schema_name, platform, tuple(sorted(campaign_columns))
+        )
+        logger.info("Creating view: %s", full_view_name)
 
         conn.sql(view_sql).collect()
-        logger.info(f"Successfully created {view_name} view in {schema_name}")
+        logger.info("Successfully created %s view in %s", view_name, schema_name)
 
         return True, f"Created view {full_view_name}"
 
     except Exception as e:
-        logger.error(f"Failed to create view: {e}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        logger.error(f"Exception details: {repr(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Failed to create view: %s", e)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Exception details: %r", e, exc_info=True)
         return False, f"Error creating view: {str(e)}"
 
 
@@ -791,48 +1205,114 @@ def insert_processing_log(
             if conn is None:
                 return False, "Failed to establish Snowflake connection"
 
-        # Single shared table name (not platform-prefixed)
-        processing_log_table = "PROCESSING_LOG"
-        full_table_name = f"{schema_name}.{processing_log_table}"
-
-        # Build INSERT statement
-        insert_sql = f"""
-            INSERT INTO {full_table_name} (
-                wave_number,
-                processing_timestamp,
-                status,
-                records_processed,
-                errors_count,
-                warnings_count,
-                processing_time_seconds,
-                client_name,
-                platform,
-                year
-            ) VALUES (
-                {wave_number},
-                CURRENT_TIMESTAMP(),
-                '{status}',
-                {records_processed},
-                {errors_count},
-                {warnings_count},
-                {processing_time},
-                '{client_name}',
-                '{platform}',
-                {year}
-            )
-            """
+        row = (
+            wave_number,
+            status,
+            records_processed,
+            errors_count,
+            warnings_count,
+            processing_time,
+            client_name,
+            platform,
+            year
+        )
 
-        logger.info(f"Inserting processing log for wave {wave_number}, platform {platform}")
+        logger.info("Inserting processing log for wave %s, platform %s", wave_number, platform)
 
-        conn.sql(insert_sql).collect()
+        # Same typed DataFrame write as the batched variant (no hand-built INSERT SQL)
+        log_success, log_msg = insert_processing_logs(schema_name, [row], conn)
+        if not log_success:
+            return False, log_msg
 
-        logger.info(f"Successfully inserted processing log for wave {wave_number}, platform {platform}")
+        logger.info("Successfully inserted processing log for wave %s, platform %s", wave_number, platform)
         return True, "Processing log inserted successfully"
 
     except Exception as e:
-        logger.error(f"Failed to insert processing log: {e}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        logger.error(f"Exception details: {repr(e)}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return False, f"Error: {str(e)}"
\ No newline at end of file
+        logger.error(
+            "Failed to insert processing log for wave %s platform %s", wave_number, platform,
+            exc_info=True
+        )
+        return False, f"Error: {str(e)}"
+
+
+def insert_processing_logs(
+    schema_name: str,
+    rows: List[tuple],
+    conn = None
+) -> Tuple[bool, str]:
+    """
+    Insert several records into the shared PROCESSING_LOG table in one write.
+
+    Each row is a tuple in the same order as the insert_processing_log arguments:
+    (wave_number, status, records_processed, errors_count, warnings_count,
+    processing_time, client_name, platform, year).
+
+    Args:
+        schema_name: Schema name (e.g., CLIENT_CATERPILLAR_2024)
+        rows: Processing log rows to insert
+        conn: Snowflake connection
+
+    Returns:
+        Tuple of (success: bool, message: str)
+    """
+    if not rows:
+        return True, "No processing log rows to insert"
+
+    try:
+        # Get connection if not provided
+        if conn is None:
+            conn = get_snowflake_connection()
+            if conn is None:
+                return False, "Failed to establish Snowflake connection"
+
+        full_table_name = f"{schema_name}.PROCESSING_LOG"
+
+        logger.info("Inserting %s processing log rows into %s", len(rows), full_table_name)
+
+        log_df = conn.create_dataframe(rows, schema=PROCESSING_LOG_SCHEMA)
+        log_df = log_df.with_column("PROCESSING_TIMESTAMP", current_timestamp())
+        log_df.write.mode("append").save_as_table(full_table_name, column_order="name")
+
+        logger.info("Successfully inserted %s processing log rows", len(rows))
+        return True, f"Inserted {len(rows)} processing log rows"
+
+    except Exception as e:
+        logger.error("Failed to insert processing logs: %s", e)
+        return False, f"Error: {str(e)}"
+
+
+@st.cache_data(ttl=CACHED_QUERY_TTL_SECONDS, show_spinner=False)
+def cached_query(_session: Session, sql: str) -> pd.DataFrame:
+    """
+    Run a read-only query and cache the result across Streamlit reruns.
+
+    The leading underscore keeps Streamlit from hashing the Session, so the
+    cache is keyed on the SQL text only.
+
+    Args:
+        _session: Snowpark Session
+        sql: SELECT statement to run (e.g. against the AUDIENCE_AD_DESCRIPTOR_DATA view)
+
+    Returns:
+        Query result as a pandas DataFrame
+    """
+    return _session.sql(sql).to_pandas()
+
+
+@st.cache_data(ttl=CACHED_QUERY_TTL_SECONDS, show_spinner=False)
+def cached_query_arrow(_session: Session, sql: str):
+    """
+    Arrow variant of cached_query, for callers that want a pyarrow.Table.
+
+    Args:
+        _session: Snowpark Session
+        sql: SELECT statement to run
+
+    Returns:
+        pyarrow.Table with the query result, or None when the query returns no rows
+    """
+    cursor = _session.connection.cursor()
+    try:
+        return cursor.execute(sql).fetch_arrow_all()
+    finally:
+        cursor.close()
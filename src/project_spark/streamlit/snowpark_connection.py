@@ -6,21 +6,81 @@ Supports both password and RSA key pair authentication.
 """
 
 import os
+import atexit
+import hashlib
 import logging
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
 from pathlib import Path
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
 from snowflake.snowpark import Session
-from snowflake.snowpark.context import get_active_session
 
 logger = logging.getLogger(__name__)
 
+# Running inside Snowflake (Streamlit-in-Snowflake); local dev skips the active-session probe
+_IN_SIS = "SNOWFLAKE_HOST" in os.environ or Path("/snowflake").exists()
+
+# cryptography backend, created on first key load
+_BACKEND = None
+
+# DER private key bytes keyed by (path, mtime_ns, passphrase blake2b digest)
+_private_key_cache: Dict[Tuple[str, int, str], bytes] = {}
+
+# Set once .env has been read into the environment
+_DOTENV_LOADED = False
+
+# Connection config loaded once per process by SnowflakeConfig.load
+_loaded_config = None
+
+# Seconds between SELECT 1 liveness pings of a pooled session
+SESSION_LIVENESS_CHECK_SECONDS = 60
+
+
+def _ensure_dotenv() -> None:
+    """
+    Load .env into the environment the first time it's needed.
+
+    Existing environment variables win (override=False). Missing python-dotenv is
+    not an error; the environment is used as-is.
+    """
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
+    except ImportError:
+        logger.debug("python-dotenv not installed, skipping .env loading")
+    _DOTENV_LOADED = True
+
+
+def _get_crypto_backend():
+    """
+    Return the shared cryptography backend, creating it on first use.
+
+    Kept lazy (rather than built at import) so the cryptography import is still
+    deferred until a key-pair login needs it.
+
+    Returns:
+        cryptography default backend
+    """
+    global _BACKEND
+    if _BACKEND is None:
+        from cryptography.hazmat.backends import default_backend
+        _BACKEND = default_backend()
+    return _BACKEND
+
 
 def load_private_key(private_key_path: str, private_key_passphrase: Optional[str] = None):
     """
     Load RSA private key from file.
 
+    The DER bytes are cached per (path, mtime, passphrase digest), so rebuilding a
+    session skips the PEM parse unless the key file changes.
+
     Args:
         private_key_path: Path to the private key file
         private_key_passphrase: Optional passphrase for encrypted private key
@@ -29,16 +89,27 @@ def load_private_key(private_key_path: str, private_key_passphrase: Optional[str
         Private key bytes in DER format
     """
     try:
-        with open(private_key_path, 'rb') as key_file:
-            if private_key_passphrase:
-                passphrase_bytes = private_key_passphrase.encode()
-            else:
-                passphrase_bytes = None
+        # Encode the passphrase once; the bytes feed both the cache key and the PEM parse
+        passphrase_bytes = private_key_passphrase.encode('utf-8') if private_key_passphrase else None
+        passphrase_digest = hashlib.blake2b(passphrase_bytes).hexdigest() if passphrase_bytes else ''
+        cache_key = (
+            os.path.abspath(private_key_path),
+            os.stat(private_key_path).st_mtime_ns,
+            passphrase_digest
+        )
+        cached_bytes = _private_key_cache.get(cache_key)
+        if cached_bytes is not None:
+            logger.debug(f"Using cached private key for {private_key_path}")
+            return cached_bytes
 
+        # Imported here so only key-pair logins pay the cryptography import cost
+        from cryptography.hazmat.primitives import serialization
+
+        with open(private_key_path, 'rb') as key_file:
             private_key = serialization.load_pem_private_key(
                 key_file.read(),
                 password=passphrase_bytes,
-                backend=default_backend()
+                backend=_get_crypto_backend()
             )
 
             # Convert to DER format (required by Snowflake)
@@ -48,120 +119,565 @@ def load_private_key(private_key_path: str, private_key_passphrase: Optional[str
                 encryption_algorithm=serialization.NoEncryption()
             )
 
+            _private_key_cache[cache_key] = private_key_bytes
             logger.info(f"Successfully loaded private key from {private_key_path}")
             return private_key_bytes
 
-    except Exception as e:
-        logger.error(f"Failed to load private key from {private_key_path}: {e}")
+    except Exception:
+        logger.error("Failed to load private key from %s", private_key_path, exc_info=True)
         raise
 
 
-def get_snowpark_session() -> Optional[Session]:
+def _try_active_session() -> Optional[Session]:
+    """
+    Return the active Streamlit-in-Snowflake session, or None when running locally.
+
+    Returns:
+        Active Snowpark Session or None
+    """
+    if not _IN_SIS:
+        return None
+    try:
+        from snowflake.snowpark.context import get_active_session
+        return get_active_session()
+    except Exception as e:
+        logger.debug(f"No active Snowpark session: {e}")
+        return None
+
+
+def _is_session_alive(session: Session) -> bool:
+    """
+    Check whether a Snowpark session can still run queries.
+
+    Args:
+        session: Snowpark Session to ping
+
+    Returns:
+        True if a trivial query succeeds, False otherwise
+    """
+    try:
+        session.sql("SELECT 1").collect()
+        return True
+    except Exception as e:
+        logger.warning(f"Cached Snowpark session is no longer usable: {e}")
+        return False
+
+
+def _close_session(session: Session) -> None:
+    """
+    Close a session, logging instead of raising on failure.
+
+    Args:
+        session: Snowpark Session to close
+    """
+    try:
+        session.close()
+    except Exception as e:
+        logger.debug(f"Failed to close Snowpark session: {e}")
+
+
+@dataclass
+class _PoolEntry:
+    """A pooled session and its bookkeeping (monotonic timestamps)."""
+    session: Session
+    last_used: float
+    last_checked: float
+    # Callers currently holding the session through SessionPool.lease
+    leases: int = 0
+    # Removed from the pool while leased; closed when the last lease is released
+    retired: bool = False
+
+
+class SessionPool:
+    """
+    Bounded LRU pool of locally built Snowpark sessions, keyed by connection parameters.
+
+    Each distinct (account, user, role, warehouse, ...) combination gets its own
+    session, shared by all callers with the same parameters. Sessions idle longer
+    than idle_seconds are closed, the least recently used session is closed when
+    the pool is full, and a session is pinged at most every
+    SESSION_LIVENESS_CHECK_SECONDS and rebuilt if it has expired or been closed.
+
+    Idle and LRU eviction never close a session that is leased out (see lease), so
+    long-running work should hold a lease. Pings, logins and closes run outside the
+    pool lock, so one slow login doesn't block callers for other parameters.
+    """
+
+    def __init__(self, max_size: int, idle_seconds: float):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[FrozenSet, _PoolEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, params: FrozenSet, force_refresh: bool = False) -> Optional[Session]:
+        """
+        Get the pooled session for a set of connection parameters, building it if needed.
+
+        The session is not leased, so it may be evicted once it has been idle for
+        idle_seconds; use lease for work that must keep it open.
+
+        Args:
+            params: Connection parameters as a frozenset of (key, value) pairs
+            force_refresh: Discard any pooled session for these parameters first
+
+        Returns:
+            Snowpark Session or None if connection fails
+        """
+        entry = self._checkout(params, force_refresh, lease=False)
+        return entry.session if entry is not None else None
+
+    @contextmanager
+    def lease(self, params: FrozenSet, force_refresh: bool = False) -> Iterator[Optional[Session]]:
+        """
+        Hold the pooled session for a set of connection parameters for the block's duration.
+
+        While leased the session is never closed by idle or LRU eviction.
+
+        Args:
+            params: Connection parameters as a frozenset of (key, value) pairs
+            force_refresh: Discard any pooled session for these parameters first
+
+        Yields:
+            Snowpark Session or None if connection fails
+        """
+        entry = self._checkout(params, force_refresh, lease=True)
+        try:
+            yield entry.session if entry is not None else None
+        finally:
+            if entry is not None:
+                self._release(entry)
+
+    def _checkout(self, params: FrozenSet, force_refresh: bool, lease: bool) -> Optional[_PoolEntry]:
+        """
+        Find, check or build the entry for params and mark it used (and leased if asked).
+
+        Args:
+            params: Connection parameters as a frozenset of (key, value) pairs
+            force_refresh: Discard any pooled session for these parameters first
+            lease: Count the caller as holding the session until _release
+
+        Returns:
+            Pool entry or None if connection fails
+        """
+        to_close: List[Session] = []
+        try:
+            with self._lock:
+                now = time.monotonic()
+                to_close += self._evict_idle(now)
+
+                entry = self._entries.get(params)
+                if entry is not None and force_refresh:
+                    to_close += self._retire(params)
+                    entry = None
+                if entry is not None:
+                    if now - entry.last_checked <= SESSION_LIVENESS_CHECK_SECONDS:
+                        self._mark_used(params, entry, now, lease)
+                        return entry
+                    # Claim the ping so concurrent callers don't repeat it
+                    entry.last_checked = now
+
+            if entry is not None:
+                alive = _is_session_alive(entry.session)
+                with self._lock:
+                    if self._entries.get(params) is entry and not alive:
+                        to_close += self._retire(params)
+                    elif params in self._entries:
+                        # Still pooled and alive, or replaced by another caller meanwhile
+                        entry = self._entries[params]
+                        self._mark_used(params, entry, time.monotonic(), lease)
+                        return entry
+
+            logger.info("Creating new Snowpark session for local development")
+            session = _build_snowpark_session(dict(params))
+            if session is None:
+                return None
+
+            with self._lock:
+                now = time.monotonic()
+                entry = self._entries.get(params)
+                if entry is not None:
+                    # Another caller built one while this login ran; keep theirs
+                    to_close.append(session)
+                else:
+                    entry = _PoolEntry(session, now, now)
+                    self._entries[params] = entry
+                self._mark_used(params, entry, now, lease)
+                to_close += self._evict_lru(keep=params)
+                return entry
+        finally:
+            for session in to_close:
+                _close_session(session)
+
+    def _release(self, entry: _PoolEntry) -> None:
+        """
+        End one lease on an entry, closing it if it was retired and this was the last lease.
+
+        Args:
+            entry: Entry returned by _checkout with lease=True
+        """
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            close = entry.retired and entry.leases == 0
+        if close:
+            _close_session(entry.session)
+
+    def _mark_used(self, params: FrozenSet, entry: _PoolEntry, now: float, lease: bool) -> None:
+        """
+        Record a checkout (caller holds the lock).
+
+        Args:
+            params: Pool key of the entry
+            entry: Pooled entry
+            now: Current monotonic time
+            lease: Count a lease on the entry
+        """
+        entry.last_used = now
+        self._entries.move_to_end(params)
+        if lease:
+            entry.leases += 1
+
+    def _retire(self, params: FrozenSet) -> List[Session]:
+        """
+        Remove an entry from the pool (caller holds the lock).
+
+        A leased entry is kept open and closed by its last _release.
+
+        Args:
+            params: Pool key of the entry
+
+        Returns:
+            Sessions the caller should close after releasing the lock
+        """
+        entry = self._entries.pop(params)
+        if entry.leases:
+            entry.retired = True
+            return []
+        return [entry.session]
+
+    def _evict_idle(self, now: float) -> List[Session]:
+        """
+        Remove unleased sessions that haven't been used within idle_seconds (caller holds the lock).
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Sessions the caller should close after releasing the lock
+        """
+        idle = [key for key, entry in self._entries.items()
+                if not entry.leases and now - entry.last_used > self.idle_seconds]
+        return [session for key in idle for session in self._retire(key)]
+
+    def _evict_lru(self, keep: FrozenSet) -> List[Session]:
+        """
+        Remove least recently used unleased sessions while the pool is over max_size
+        (caller holds the lock). Leased sessions may keep the pool over size until released.
+
+        Args:
+            keep: Pool key just handed to a caller, never evicted here
+
+        Returns:
+            Sessions the caller should close after releasing the lock
+        """
+        to_close: List[Session] = []
+        while len(self._entries) > self.max_size:
+            key = next(
+                (key for key, entry in self._entries.items() if not entry.leases and key != keep),
+                None
+            )
+            if key is None:
+                break
+            logger.info("Snowpark session pool full, closing least recently used session")
+            to_close += self._retire(key)
+        return to_close
+
+    def close_all(self) -> None:
+        """
+        Close every pooled session, leased or not (called at interpreter exit).
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            _close_session(entry.session)
+
+
+POOL = SessionPool(
+    max_size=int(os.getenv('SNOWFLAKE_POOL_MAX', '8')),
+    idle_seconds=float(os.getenv('SNOWFLAKE_POOL_IDLE_S', '540'))
+)
+
+
+def close_snowpark_sessions() -> None:
+    """
+    Close every pooled local session and forget the cached connection config.
+
+    The next get_snowpark_session call re-reads the config and logs in again.
+    """
+    global _loaded_config
+    POOL.close_all()
+    _loaded_config = None
+
+
+def get_snowpark_session(force_refresh: bool = False) -> Optional[Session]:
     """
     Get Snowpark session for both local development and Snowflake deployment.
     
     Priority order:
     1. Active session (when running in Streamlit-in-Snowflake)
-    2. New session from environment variables (for local development)
-    3. New session from Streamlit secrets (for local Streamlit testing)
+    2. Pooled session for the current connection parameters
+    3. New session from Streamlit secrets or environment variables (for local development)
+    
+    Locally built sessions live in POOL, so Streamlit reruns don't log in to
+    Snowflake again. The returned session isn't leased; long-running work should
+    use leased_snowpark_session so the pool can't close it mid-use.
+    
+    Args:
+        force_refresh: Discard the pooled session for the current parameters and build a new one
     
     Returns:
         Snowpark Session or None if connection fails
     """
     # Try to get active session first (Streamlit-in-Snowflake)
-    try:
-        session = get_active_session()
+    session = _try_active_session()
+    if session is not None:
         logger.info("Using active Snowpark session (deployed in Snowflake)")
         return session
-    except:
-        logger.info("No active session found, creating new Snowpark session for local development")
-    
-    # Create new session for local development
-    try:
-        # Try Streamlit secrets first
+    logger.debug("No active session found, using local Snowpark session")
+
+    config = SnowflakeConfig.load()
+    if config is None:
+        return None
+    return POOL.acquire(frozenset(config.as_params().items()), force_refresh=force_refresh)
+
+
+@contextmanager
+def leased_snowpark_session(force_refresh: bool = False) -> Iterator[Optional[Session]]:
+    """
+    Like get_snowpark_session, but a pooled local session is leased for the block,
+    so the pool can't close it while long-running work (e.g. an upload) uses it.
+
+    Args:
+        force_refresh: Discard the pooled session for the current parameters and build a new one
+
+    Yields:
+        Snowpark Session or None if connection fails
+    """
+    session = _try_active_session()
+    if session is not None:
+        logger.info("Using active Snowpark session (deployed in Snowflake)")
+        yield session
+        return
+
+    config = SnowflakeConfig.load()
+    if config is None:
+        yield None
+        return
+    with POOL.lease(frozenset(config.as_params().items()), force_refresh=force_refresh) as session:
+        yield session
+
+
+@dataclass(frozen=True)
+class SnowflakeConfig:
+    """
+    Snowflake connection settings for local development.
+
+    Frozen (and therefore hashable) so one loaded config can key the session pool.
+    Exactly one of password/private_key is normally set; private key takes priority.
+    """
+    account: str
+    user: str
+    warehouse: Optional[str] = None
+    database: Optional[str] = None
+    schema: Optional[str] = "PUBLIC"
+    role: Optional[str] = None
+    password: Optional[str] = field(default=None, repr=False)
+    private_key: Optional[bytes] = field(default=None, repr=False)
+
+    @classmethod
+    def from_secrets(cls) -> Optional["SnowflakeConfig"]:
+        """
+        Build config from the [snowflake] section of Streamlit secrets.
+
+        Returns:
+            SnowflakeConfig or None if secrets aren't available
+        """
         try:
             import streamlit as st
             if hasattr(st, 'secrets') and 'snowflake' in st.secrets:
                 config = st.secrets['snowflake']
-                connection_parameters = {
-                    "account": config.get("account"),
-                    "user": config.get("user"),
-                    "password": config.get("password"),
-                    "warehouse": config.get("warehouse"),
-                    "database": config.get("database"),
-                    "schema": config.get("schema", "PUBLIC"),
-                    "role": config.get("role")
-                }
-                logger.info("Creating Snowpark session from Streamlit secrets")
-                session = Session.builder.configs(connection_parameters).create()
-                return session
+                logger.debug("Using Snowflake connection parameters from Streamlit secrets")
+                return cls(
+                    account=config.get("account"),
+                    user=config.get("user"),
+                    password=config.get("password"),
+                    warehouse=config.get("warehouse"),
+                    database=config.get("database"),
+                    schema=config.get("schema", "PUBLIC"),
+                    role=config.get("role")
+                )
         except (ImportError, FileNotFoundError, KeyError) as e:
             logger.debug(f"Streamlit secrets not available: {e}")
-        
-        # Fall back to environment variables
-        from dotenv import load_dotenv
-        load_dotenv()
-
-        account = os.getenv('SNOWFLAKE_ACCOUNT')
-        user = os.getenv('SNOWFLAKE_USER')
-        password = os.getenv('SNOWFLAKE_PASSWORD')
-        private_key_path = os.getenv('SNOWFLAKE_PRIVATE_KEY_PATH')
-        private_key_passphrase = os.getenv('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE')
-
-        connection_parameters = {
-            "account": account,
-            "user": user,
-            "warehouse": os.getenv('SNOWFLAKE_WAREHOUSE'),
-            "database": os.getenv('SNOWFLAKE_DATABASE'),
-            "schema": os.getenv('SNOWFLAKE_SCHEMA', 'PUBLIC'),
-            "role": os.getenv('SNOWFLAKE_ROLE')
-        }
+        return None
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> Optional["SnowflakeConfig"]:
+        """
+        Build config from SNOWFLAKE_* environment variables (.env is loaded once per process).
+
+        The variables are read from one snapshot of os.environ rather than repeated getenv calls.
+
+        Args:
+            env: Environment mapping to read instead of os.environ (e.g. in tests)
+
+        Returns:
+            SnowflakeConfig or None if required settings or credentials are missing
+        """
+        if env is None:
+            _ensure_dotenv()
+            env = os.environ.copy()
+
+        account = env.get('SNOWFLAKE_ACCOUNT')
+        user = env.get('SNOWFLAKE_USER')
+        password = env.get('SNOWFLAKE_PASSWORD')
+        private_key_path = env.get('SNOWFLAKE_PRIVATE_KEY_PATH') or env.get('SNOWFLAKE_PRIVATE_KEY_FILE')
+        private_key_passphrase = env.get('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE')
 
         # Validate required parameters
         if not all([account, user]):
             logger.error("Missing required Snowflake connection parameters (account, user)")
             return None
 
+        private_key = None
+
         # Determine authentication method: RSA key pair (preferred) or password
         if private_key_path and os.path.exists(private_key_path):
             # RSA Key Pair Authentication
-            logger.info("Using RSA key pair authentication")
+            logger.debug("Using RSA key pair authentication")
             try:
-                private_key_bytes = load_private_key(private_key_path, private_key_passphrase)
-                connection_parameters["private_key"] = private_key_bytes
-                logger.info("Creating Snowpark session with RSA key pair authentication")
+                private_key = load_private_key(private_key_path, private_key_passphrase)
+                password = None
             except Exception as e:
                 logger.error(f"Failed to load private key, falling back to password auth: {e}")
                 if not password:
                     logger.error("No password available as fallback")
                     return None
-                connection_parameters["password"] = password
         elif password:
             # Password Authentication
-            logger.info("Using password authentication")
-            connection_parameters["password"] = password
+            logger.debug("Using password authentication")
         else:
             logger.error("No authentication method available (need either private key or password)")
             return None
 
+        return cls(
+            account=account,
+            user=user,
+            warehouse=env.get('SNOWFLAKE_WAREHOUSE'),
+            database=env.get('SNOWFLAKE_DATABASE'),
+            schema=env.get('SNOWFLAKE_SCHEMA', 'PUBLIC'),
+            role=env.get('SNOWFLAKE_ROLE'),
+            password=password,
+            private_key=private_key
+        )
+
+    @classmethod
+    def load(cls, refresh: bool = False) -> Optional["SnowflakeConfig"]:
+        """
+        Load config from Streamlit secrets, falling back to the environment.
+
+        A successfully loaded config is cached for the process; failures are retried.
+
+        Args:
+            refresh: Ignore the cached config and read the sources again
+
+        Returns:
+            SnowflakeConfig or None if no usable configuration was found
+        """
+        global _loaded_config
+        if _loaded_config is None or refresh:
+            try:
+                _loaded_config = cls.from_secrets() or cls.from_env()
+            except Exception:
+                logger.error("Failed to read Snowflake connection parameters", exc_info=True)
+                return None
+        return _loaded_config
+
+    def as_params(self) -> Dict[str, Any]:
+        """
+        Connection parameters for Session.builder.configs.
+
+        Returns:
+            Dictionary of parameters (unset credentials are omitted)
+        """
+        params = asdict(self)
+        for credential in ('password', 'private_key'):
+            if params[credential] is None:
+                del params[credential]
+        return params
+
+
+def _build_snowpark_session(connection_parameters: Dict[str, Any]) -> Optional[Session]:
+    """
+    Build a new Snowpark session from connection parameters.
+    
+    Unless SNOWFLAKE_DISABLE_SESSION_HINTS is set (e.g. in tests), the session is
+    created with client_session_keep_alive and USE_CACHED_RESULT is turned on.
+    
+    Args:
+        connection_parameters: Parameters from SnowflakeConfig.as_params
+    
+    Returns:
+        Snowpark Session or None if connection fails
+    """
+    apply_hints = os.getenv('SNOWFLAKE_DISABLE_SESSION_HINTS', '').lower() not in ('1', 'true', 'yes')
+    if apply_hints:
+        # Heartbeat keeps idle app sessions from expiring between reruns
+        connection_parameters = {**connection_parameters, "client_session_keep_alive": True}
+
+    try:
         session = Session.builder.configs(connection_parameters).create()
-        return session
-        
-    except Exception as e:
-        logger.error(f"Failed to create Snowpark session: {e}")
+    except Exception:
+        logger.error("Failed to create Snowpark session", exc_info=True)
         return None
 
+    if apply_hints:
+        # Let repeat dashboard reads of the views come from the result cache
+        try:
+            session.sql("ALTER SESSION SET USE_CACHED_RESULT = TRUE").collect()
+        except Exception as e:
+            logger.warning(f"Could not apply session hints: {e}")
+
+    return session
+
+
+atexit.register(POOL.close_all)
 
-def test_snowpark_connection(session: Session) -> bool:
+
+def test_snowpark_connection(session: Session, deep: bool = False) -> bool:
     """
     Test the Snowpark session connection.
     
+    The default check only asks the client whether the connection is closed, which
+    needs no round trip or warehouse. Pass deep=True to run a version query instead.
+    
     Args:
         session: Snowpark Session to test
+        deep: Run SELECT CURRENT_VERSION() against Snowflake
         
     Returns:
         True if connection successful, False otherwise
     """
+    if not deep:
+        try:
+            is_open = not session._conn.is_closed()
+        except Exception as e:
+            logger.error(f"Snowpark connection test failed: {e}")
+            return False
+        if not is_open:
+            logger.error("Snowpark connection test failed: session is closed")
+        return is_open
+
     try:
         result = session.sql("SELECT CURRENT_VERSION()").collect()
         version = result[0][0]
@@ -170,4 +686,3 @@ def test_snowpark_connection(session: Session) -> bool:
     except Exception as e:
         logger.error(f"Snowpark connection test failed: {e}")
         return False
-
@@ -2,50 +2,183 @@
 SQL statement generation for campaign data tables.
 """
 
-from typing import Dict
-
-def generate_schema_creation_statements(schema_name: str, platform: str) -> Dict[str, str]:
+import functools
+import sys
+from string import Template
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+
+# Column spec for the PROCESSED_CAMPAIGN_DATA table, grouped by section:
+# (section comment, ((column name, SQL type), ...)). The DDL body is rendered from it once.
+CAMPAIGN_DATA_COLUMN_SECTIONS: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...] = (
+    ("Campaign & Ad Info (ad_name is the MERGE key)", (
+        ("campaign_name", "STRING"),
+        ("ad_name", "STRING"),
+        ("ad_set_name", "STRING"),
+        ("ad_delivery", "STRING"),
+        ("starts", "DATETIME"),
+        ("ends", "DATETIME"),
+        ("reporting_starts", "DATETIME"),
+        ("reporting_ends", "DATETIME"),
+        ("last_significant_edit", "DATETIME"),
+        ("wave_number", "INT"),
+        ("attribution_setting", "STRING"),
+    )),
+    ("Budget & Spend", (
+        ("amount_spent_usd", "FLOAT"),
+        ("ad_set_budget", "FLOAT"),
+        ("ad_set_budget_type", "STRING"),
+        ("bid", "FLOAT"),
+        ("bid_type", "STRING"),
+        ("cpm_usd", "FLOAT"),
+    )),
+    ("Core Performance Metrics", (
+        ("results", "INT"),
+        ("result_indicator", "STRING"),
+        ("cost_per_result", "FLOAT"),
+        ("frequency", "FLOAT"),
+        ("reach", "INT"),
+        ("impressions", "INT"),
+        ("unique_link_clicks", "INT"),
+        ("landing_page_views", "INT"),
+        ("email_signups", "INT"),
+    )),
+    ("Essential KPIs (lowercase for consistency)", (
+        ("kpv_community", "INT"),
+        ("kpv_tool", "INT"),
+        ("kpv_transformation", "INT"),
+        ("kpv_support", "INT"),
+        ("kpv_nohero", "INT"),
+        ("kpv_inspiration", "INT"),
+        ("kpv_authentic", "INT"),
+        ("kpv_nextlevel", "INT"),
+        ("kpv_nextchapter", "INT"),
+        ("kpv_workshop", "INT"),
+        ("kpv_openhouse", "INT"),
+    )),
+    ("Lead Generation (lowercase for consistency)", (
+        ("lead_openhouse", "INT"),
+        ("lead_workshop", "INT"),
+        ("lead_info", "INT"),
+    )),
+    ("Click Events (lowercase for consistency)", (
+        ("click_findout", "INT"),
+        ("click_letschat", "INT"),
+        ("click_openhouse", "INT"),
+        ("click_workshop", "INT"),
+        ("click_info", "INT"),
+    )),
+    ("E-commerce Metrics - Add to Cart", (
+        ("adds_to_cart", "INT"),
+        ("in_app_adds_to_cart", "INT"),
+        ("website_adds_to_cart", "INT"),
+        ("offline_adds_to_cart", "INT"),
+        ("meta_add_to_cart", "INT"),
+    )),
+    ("E-commerce Metrics - Checkouts", (
+        ("checkouts_initiated", "INT"),
+        ("in_app_checkouts", "INT"),
+        ("website_checkouts", "INT"),
+        ("offline_checkouts", "INT"),
+        ("meta_checkouts", "INT"),
+    )),
+    ("E-commerce Metrics - Purchases", (
+        ("purchases", "INT"),
+        ("in_app_purchases", "INT"),
+        ("website_purchases", "INT"),
+        ("offline_purchases", "INT"),
+        ("meta_purchases", "INT"),
+    )),
+    ("Registration Metrics", (
+        ("registrations_completed", "INT"),
+        ("in_app_registrations", "INT"),
+        ("website_registrations", "INT"),
+        ("offline_registrations", "INT"),
+    )),
+    ("Social Engagement Metrics", (
+        ("instagram_profile_visits", "INT"),
+        ("post_comments", "INT"),
+        ("post_reactions", "INT"),
+        ("post_saves", "INT"),
+        ("post_shares", "INT"),
+        ("post_engagements", "INT"),
+        ("video_avg_play_time", "FLOAT"),
+    )),
+)
+
+# Flat (column name, SQL type) pairs in table order
+CAMPAIGN_DATA_COLUMNS: Tuple[Tuple[str, str], ...] = tuple(
+    column for _, columns in CAMPAIGN_DATA_COLUMN_SECTIONS for column in columns
+)
+
+
+def _render_column_sections(sections, indent: str = " " * 16) -> str:
     """
-    Generate all table creation statements for a specific platform.
-
-    NEW STRUCTURE: One schema per client/year, platform-prefixed tables.
-    Example: CLIENT_CATERPILLAR_2024 with META_NAMING_KEYS, LINKEDIN_NAMING_KEYS, etc.
-
-    PROCESSING_LOG: Single table per schema (not platform-prefixed) with platform column.
-
-    This is the SINGLE SOURCE OF TRUTH for all table creation SQL.
-    All other components should reference this function to avoid duplication.
+    Render sectioned column specs as the body of a CREATE TABLE statement.
 
     Args:
-        schema_name: Target schema name (e.g., 'CLIENT_CATERPILLAR_2024')
-        platform: Platform name (e.g., 'meta', 'linkedin')
+        sections: Sequence of (section comment, ((column name, SQL type), ...))
+        indent: Leading whitespace for each line
 
     Returns:
-        Dictionary with statement types as keys and SQL statements as values
+        Column definitions with section comments, each line ending in a comma
     """
-
-    # Generate platform-prefixed table names (except processing_log which is shared)
-    prefix = platform.upper()
-    naming_keys_table = f"{prefix}_NAMING_KEYS"
-    campaign_data_table = f"{prefix}_PROCESSED_CAMPAIGN_DATA"
-    processing_log_table = "PROCESSING_LOG"  # Single shared table for all platforms
-    stage_name = f"{schema_name}_STAGE"
-
-    statements = {
-        'create_schema': f"CREATE SCHEMA IF NOT EXISTS {schema_name}",
-        
-        'create_stage': f"""
-            CREATE STAGE IF NOT EXISTS {schema_name}.{stage_name}
+    blocks = []
+    for title, columns in sections:
+        lines = [f"{indent}-- {title}"]
+        lines.extend(f"{indent}{name} {sql_type}," for name, sql_type in columns)
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+# Rendered once at import; only schema and table names vary per call
+CAMPAIGN_DATA_COLUMNS_DDL = _render_column_sections(CAMPAIGN_DATA_COLUMN_SECTIONS)
+
+# Naming key columns exposed by the view (ad_set_name comes from the campaign side)
+VIEW_NAMING_KEY_COLUMNS: Tuple[str, ...] = (
+    'audience',
+    'ad_descriptor',
+    'landing_page',
+    'position',
+    'concept',
+    'ad_direction',
+)
+
+# Order of the combined 'batch' statement (schema first; the rest only need the schema)
+BATCH_STATEMENT_ORDER: Tuple[str, ...] = (
+    'create_schema',
+    'create_stage',
+    'create_parquet_file_format',
+    'create_naming_keys_table',
+    'create_processed_campaign_data_table',
+    'create_processing_log_table',
+)
+
+# Interned platform-prefixed names per platform (see _names_for)
+_PREFIX_CACHE: Dict[str, Dict[str, str]] = {}
+
+# DDL templates, stripped once at import; ${schema} is the schema name and the table
+# placeholders come from _names_for (PROCESSING_LOG is shared across platforms)
+_SCHEMA_TMPL = Template("CREATE SCHEMA IF NOT EXISTS ${schema}")
+
+# Transient schema (e.g. for tests): its tables are transient too, with no fail-safe or time travel
+_TRANSIENT_SCHEMA_TMPL = Template(
+    "CREATE TRANSIENT SCHEMA IF NOT EXISTS ${schema} DATA_RETENTION_TIME_IN_DAYS = 0"
+)
+
+_STAGE_TMPL = Template("""
+            CREATE STAGE IF NOT EXISTS ${schema}.${schema}_STAGE
             FILE_FORMAT = (TYPE = CSV SKIP_HEADER = 1 FIELD_OPTIONALLY_ENCLOSED_BY = '"')
-            """.strip(),
+            """.strip())
 
-        'create_naming_keys_table': f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.{naming_keys_table} (
+_NAMING_KEYS_TMPL = Template("""
+            CREATE TABLE IF NOT EXISTS ${schema}.${naming_keys} (
                 -- Wave identification
                 wave_number INT,
 
-                -- Ad Set Information (Primary Key)
-                ad_set_name STRING PRIMARY KEY,
+                -- Ad Set Information (ad_set_name is the MERGE key)
+                ad_set_name STRING,
                 audience STRING,
                 concept STRING,
                 position STRING,
@@ -56,113 +189,21 @@ def generate_schema_creation_statements(schema_name: str, platform: str) -> Dict
                 -- Processing metadata
                 upload_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
             )
-            """.strip(),
-            
-        'create_processed_campaign_data_table': f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.{campaign_data_table} (
-                -- Campaign & Ad Info (Primary Key)
-                campaign_name STRING,
-                ad_name STRING PRIMARY KEY,
-                ad_set_name STRING,
-                ad_delivery STRING,
-                starts DATETIME,
-                ends DATETIME,
-                reporting_starts DATETIME,
-                reporting_ends DATETIME,
-                last_significant_edit DATETIME,
-                wave_number INT,
-                attribution_setting STRING,
-
-                -- Budget & Spend
-                amount_spent_usd FLOAT,
-                ad_set_budget FLOAT,
-                ad_set_budget_type STRING,
-                bid FLOAT,
-                bid_type STRING,
-                cpm_usd FLOAT,
-
-                -- Core Performance Metrics
-                results INT,
-                result_indicator STRING,
-                cost_per_result FLOAT,
-                frequency FLOAT,
-                reach INT,
-                impressions INT,
-                unique_link_clicks INT,
-                landing_page_views INT,
-                email_signups INT,
-
-                -- Essential KPIs (lowercase for consistency)
-                kpv_community INT,
-                kpv_tool INT,
-                kpv_transformation INT,
-                kpv_support INT,
-                kpv_nohero INT,
-                kpv_inspiration INT,
-                kpv_authentic INT,
-                kpv_nextlevel INT,
-                kpv_nextchapter INT,
-                kpv_workshop INT,
-                kpv_openhouse INT,
-
-                -- Lead Generation (lowercase for consistency)
-                lead_openhouse INT,
-                lead_workshop INT,
-                lead_info INT,
-
-                -- Click Events (lowercase for consistency)
-                click_findout INT,
-                click_letschat INT,
-                click_openhouse INT,
-                click_workshop INT,
-                click_info INT,
-
-                -- E-commerce Metrics - Add to Cart
-                adds_to_cart INT,
-                in_app_adds_to_cart INT,
-                website_adds_to_cart INT,
-                offline_adds_to_cart INT,
-                meta_add_to_cart INT,
-
-                -- E-commerce Metrics - Checkouts
-                checkouts_initiated INT,
-                in_app_checkouts INT,
-                website_checkouts INT,
-                offline_checkouts INT,
-                meta_checkouts INT,
-
-                -- E-commerce Metrics - Purchases
-                purchases INT,
-                in_app_purchases INT,
-                website_purchases INT,
-                offline_purchases INT,
-                meta_purchases INT,
-
-                -- Registration Metrics
-                registrations_completed INT,
-                in_app_registrations INT,
-                website_registrations INT,
-                offline_registrations INT,
-
-                -- Social Engagement Metrics
-                instagram_profile_visits INT,
-                post_comments INT,
-                post_reactions INT,
-                post_saves INT,
-                post_shares INT,
-                post_engagements INT,
-                video_avg_play_time FLOAT,
+            CLUSTER BY (wave_number)
+            """.strip())
 
-                -- Processing metadata
-                upload_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP(),
+_CAMPAIGN_DATA_TMPL = Template(("""
+            CREATE TABLE IF NOT EXISTS ${schema}.${campaign_data} (
+""" + CAMPAIGN_DATA_COLUMNS_DDL + """
 
-                -- Foreign Key Constraint
-                FOREIGN KEY (ad_set_name) REFERENCES {schema_name}.{naming_keys_table}(ad_set_name)
+                -- Processing metadata
+                upload_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
             )
-            """.strip(),
-        
-        'create_processing_log_table': f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.{processing_log_table} (
+            CLUSTER BY (wave_number)
+            """).strip())
+
+_PROCESSING_LOG_TMPL = Template("""
+            CREATE TABLE IF NOT EXISTS ${schema}.PROCESSING_LOG (
                 -- Primary key
                 log_id INTEGER AUTOINCREMENT PRIMARY KEY,
                 
@@ -182,13 +223,98 @@ def generate_schema_creation_statements(schema_name: str, platform: str) -> Dict
                 platform STRING,
                 year INT
             )
-            """.strip()
+            """.strip())
+
+
+def _names_for(platform: str) -> Dict[str, str]:
+    """
+    Platform-prefixed object names, built and interned once per platform.
+
+    Args:
+        platform: Platform name (e.g., 'meta', 'linkedin')
+
+    Returns:
+        Dictionary with 'prefix', 'naming_keys', 'campaign_data' and 'view' names
+    """
+    names = _PREFIX_CACHE.get(platform)
+    if names is None:
+        prefix = platform.upper()
+        names = {
+            'prefix': sys.intern(prefix),
+            'naming_keys': sys.intern(f"{prefix}_NAMING_KEYS"),
+            'campaign_data': sys.intern(f"{prefix}_PROCESSED_CAMPAIGN_DATA"),
+            'view': sys.intern(f"{prefix}_AUDIENCE_AD_DESCRIPTOR_DATA"),
+        }
+        _PREFIX_CACHE[platform] = names
+    return names
+
+
+def generate_parquet_file_format_statement(schema_name: str) -> str:
+    """
+    Generate the CREATE FILE FORMAT statement used to read staged MERGE sources.
+
+    Args:
+        schema_name: Target schema name (e.g., 'CLIENT_CATERPILLAR_2024')
+
+    Returns:
+        CREATE FILE FORMAT SQL statement
+    """
+    return f"CREATE FILE FORMAT IF NOT EXISTS {schema_name}.PARQUET_FORMAT TYPE = PARQUET"
+
+
+@functools.lru_cache(maxsize=64)
+def generate_schema_creation_statements(
+    schema_name: str,
+    platform: str,
+    transient: bool = False
+) -> Mapping[str, str]:
+    """
+    Generate all table creation statements for a specific platform.
+
+    NEW STRUCTURE: One schema per client/year, platform-prefixed tables.
+    Example: CLIENT_CATERPILLAR_2024 with META_NAMING_KEYS, LINKEDIN_NAMING_KEYS, etc.
+
+    PROCESSING_LOG: Single table per schema (not platform-prefixed) with platform column.
+
+    This is the SINGLE SOURCE OF TRUTH for all table creation SQL.
+    All other components should reference this function to avoid duplication.
+
+    Results are cached per (schema_name, platform, transient) and returned as a
+    read-only mapping, since every caller shares the same instance.
+
+    Args:
+        schema_name: Target schema name (e.g., 'CLIENT_CATERPILLAR_2024')
+        platform: Platform name (e.g., 'meta', 'linkedin')
+        transient: Create a transient schema with 0-day retention (tables inherit it)
+
+    Returns:
+        Read-only mapping with statement types as keys and SQL statements as values
+    """
+
+    # Platform-prefixed table names (except PROCESSING_LOG, which is shared)
+    names = {'schema': schema_name, **_names_for(platform)}
+
+    statements = {
+        'create_schema': (_TRANSIENT_SCHEMA_TMPL if transient else _SCHEMA_TMPL).substitute(names),
+        'create_stage': _STAGE_TMPL.substitute(names),
+        'create_parquet_file_format': generate_parquet_file_format_statement(schema_name),
+        'create_naming_keys_table': _NAMING_KEYS_TMPL.substitute(names),
+        'create_processed_campaign_data_table': _CAMPAIGN_DATA_TMPL.substitute(names),
+        'create_processing_log_table': _PROCESSING_LOG_TMPL.substitute(names)
     }
+
+    # All DDL as one multi-statement request (requires MULTI_STATEMENT_COUNT = 0)
+    statements['batch'] = ";\n".join(statements[key] for key in BATCH_STATEMENT_ORDER)
     
-    return statements
+    return MappingProxyType(statements)
 
 
-def generate_view_creation_statement(schema_name: str, platform: str) -> str:
+@functools.lru_cache(maxsize=64)
+def generate_view_creation_statement(
+    schema_name: str,
+    platform: str,
+    extra_campaign_columns: Tuple[str, ...] = ()
+) -> str:
     """
     Generate CREATE VIEW statement for AUDIENCE_AD_DESCRIPTOR_DATA view.
     
@@ -201,36 +327,50 @@ def generate_view_creation_statement(schema_name: str, platform: str) -> str:
     This is the SINGLE SOURCE OF TRUTH for the view definition.
     All other components should reference this function to avoid duplication and ensure consistency.
 
+    Campaign columns are listed explicitly (from CAMPAIGN_DATA_COLUMNS, plus any columns
+    added by schema expansion) instead of d.*, so the optimizer can prune unused
+    columns. Campaign rows without a matching naming key are kept (LEFT JOIN).
+
+    Results are cached per (schema_name, platform, extra_campaign_columns).
+
     Args:
         schema_name: Target schema name (e.g., 'CLIENT_CATERPILLAR_2024')
         platform: Platform name (e.g., 'meta', 'linkedin')
+        extra_campaign_columns: Campaign table columns not in CAMPAIGN_DATA_COLUMNS
 
     Returns:
         CREATE VIEW SQL statement with all columns
     """
-    # Generate platform-prefixed table and view names
-    prefix = platform.upper()
-    view_name = f"{prefix}_AUDIENCE_AD_DESCRIPTOR_DATA"
-    campaign_data_table = f"{prefix}_PROCESSED_CAMPAIGN_DATA"
-    naming_keys_table = f"{prefix}_NAMING_KEYS"
+    # Platform-prefixed table and view names, shared with the table DDL
+    names = _names_for(platform)
+    view_name = names['view']
+    campaign_data_table = names['campaign_data']
+    naming_keys_table = names['naming_keys']
+
+    known_columns = {name for name, _ in CAMPAIGN_DATA_COLUMNS} | {'upload_timestamp'}
+    campaign_columns = [name for name, _ in CAMPAIGN_DATA_COLUMNS] + ['upload_timestamp'] + sorted(
+        col for col in {c.lower() for c in extra_campaign_columns} if col not in known_columns
+    )
+
+    select_list = ",\n            ".join(
+        [f"d.{col}" for col in campaign_columns] + [f"nk.{col}" for col in VIEW_NAMING_KEY_COLUMNS]
+    )
 
     view_sql = f"""
         CREATE OR REPLACE VIEW {schema_name}.{view_name} AS
         SELECT
-            -- All columns from campaign data
-            d.*,
-            
-            -- All columns from naming keys (except ad_set_name to avoid duplication)
-            nk.audience,
-            nk.ad_descriptor,
-            nk.landing_page,
-            nk.position,
-            nk.concept,
-            nk.ad_direction
-            
+            {select_list}
         FROM {schema_name}.{campaign_data_table} d
-        JOIN {schema_name}.{naming_keys_table} nk
+        LEFT JOIN {schema_name}.{naming_keys_table} nk
             ON d.ad_set_name = nk.ad_set_name;
         """
 
-    return view_sql.strip()
\ No newline at end of file
+    return view_sql.strip()
+
+
+def clear_template_caches() -> None:
+    """
+    Clear the memoized statement generators (e.g. between tests).
+    """
+    generate_schema_creation_statements.cache_clear()
+    generate_view_creation_statement.cache_clear()
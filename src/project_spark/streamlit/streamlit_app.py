@@ -5,22 +5,21 @@ Simple Streamlit application for processing campaign data.
 
 import streamlit as st
 import pandas as pd
+import io
+import logging
 import tempfile
 import os
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from data_processor import CampaignDataProcessor
-from snowflake_operations import (
-    get_snowflake_connection,
-    create_schema_and_tables,
-    rename_uploaded_file,
-    populate_naming_keys_table,
-    populate_campaign_data_table,
-    insert_processing_log,
-    upload_csv_to_stage,
-    create_audience_ad_descriptor_view
-)
 import constants
+# snowflake_operations (Snowpark, connector, pyarrow) is imported where it is used,
+# so the first page render doesn't pay for the Snowflake stack
+
+# Configure logging once for the app; library modules only create loggers
+logging.basicConfig(level=logging.INFO)
 
 # Page configuration
 st.set_page_config(
@@ -33,7 +32,7 @@ st.set_page_config(
     }
 )
 
-def upload_to_snowflake(conn, campaign_df, naming_df, schema_name, wave_number, client_name, platform, year, start_time, campaign_file, naming_file):
+def upload_to_snowflake(conn, campaign_df, naming_df, schema_name, wave_number, client_name, platform, year, start_time, campaign_file, naming_file, enable_parallel_load=True):
     """
     Upload processed data to Snowflake with UPSERT logic.
 
@@ -49,10 +48,20 @@ def upload_to_snowflake(conn, campaign_df, naming_df, schema_name, wave_number,
         start_time: Processing start time for calculating duration
         campaign_file: Campaign uploaded file object
         naming_file: Naming uploaded file object
+        enable_parallel_load: Populate the naming keys and campaign tables concurrently
 
     Returns:
         Tuple of (success: bool, messages: list)
     """
+    from snowflake_operations import (
+        create_schema_and_tables,
+        populate_naming_keys_table,
+        populate_campaign_data_table,
+        insert_processing_log,
+        upload_csv_to_stage,
+        create_audience_ad_descriptor_view
+    )
+
     messages = []
     errors_count = 0
     warnings_count = 0
@@ -74,58 +83,85 @@ def upload_to_snowflake(conn, campaign_df, naming_df, schema_name, wave_number,
         # Step 2: Upload CSV files to stage
         st.write("Uploading CSV files to Snowflake stage...")
 
-        # Upload campaign file (for backup/audit - non-critical)
-        campaign_stage_success, campaign_stage_msg = upload_csv_to_stage(
-            campaign_file, schema_name, wave_number, 'campaigns',
-            client_name, platform, year, conn
-        )
-        messages.append(campaign_stage_msg)
-
-        if campaign_stage_success:
-            st.write(f"✅ {campaign_stage_msg}")
-        else:
-            warnings_count += 1
-            st.write(f"⚠️ {campaign_stage_msg} (non-critical, continuing...)")
-
-        # Upload naming file (for backup/audit - non-critical)
-        naming_stage_success, naming_stage_msg = upload_csv_to_stage(
-            naming_file, schema_name, wave_number, 'naming_keys',
-            client_name, platform, year, conn
-        )
-        messages.append(naming_stage_msg)
-
-        if naming_stage_success:
-            st.write(f"✅ {naming_stage_msg}")
+        # Upload both files concurrently (for backup/audit - non-critical);
+        # results are reported from this thread since st.write needs the script context
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            campaign_future = executor.submit(
+                upload_csv_to_stage,
+                campaign_file, schema_name, wave_number, 'campaigns',
+                client_name, platform, year, conn
+            )
+            naming_future = executor.submit(
+                upload_csv_to_stage,
+                naming_file, schema_name, wave_number, 'naming_keys',
+                client_name, platform, year, conn
+            )
+            stage_results = [campaign_future.result(), naming_future.result()]
+
+        # Render each step's results as one element rather than one per message
+        step_log = []
+        for stage_success, stage_msg in stage_results:
+            messages.append(stage_msg)
+
+            if stage_success:
+                step_log.append(f"✅ {stage_msg}")
+            else:
+                warnings_count += 1
+                step_log.append(f"⚠️ {stage_msg} (non-critical, continuing...)")
+        st.markdown("  \n".join(step_log))
+
+        # Steps 3 & 4: Populate naming keys and campaign data tables (independent tables)
+        if enable_parallel_load:
+            st.write("Populating naming keys and campaign data tables...")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                naming_future = executor.submit(
+                    populate_naming_keys_table, naming_df, schema_name, platform, wave_number, conn
+                )
+                campaign_future = executor.submit(
+                    populate_campaign_data_table, campaign_df, schema_name, platform, wave_number, conn
+                )
+                load_results = [naming_future.result(), campaign_future.result()]
         else:
-            warnings_count += 1
-            st.write(f"⚠️ {naming_stage_msg} (non-critical, continuing...)")
-
-        # Step 3: Populate naming keys table
-        st.write("Populating naming keys table...")
-        naming_success, naming_msg = populate_naming_keys_table(
-            naming_df, schema_name, platform, wave_number, conn
-        )
-        messages.append(naming_msg)
-
-        if not naming_success:
-            errors_count += 1
-            return False, messages
-
-        st.write(f"✅ {naming_msg}")
-
-        # Step 4: Populate campaign data table
-        st.write("Populating campaign data table...")
-        campaign_success, campaign_msg = populate_campaign_data_table(
-            campaign_df, schema_name, platform, wave_number, conn
-        )
-        messages.append(campaign_msg)
-
-        if not campaign_success:
-            errors_count += 1
+            load_results = []
+            for label, populate, df in (
+                ("naming keys", populate_naming_keys_table, naming_df),
+                ("campaign data", populate_campaign_data_table, campaign_df),
+            ):
+                st.write(f"Populating {label} table...")
+                load_results.append(populate(df, schema_name, platform, wave_number, conn))
+                if not load_results[-1][0]:
+                    break
+
+        step_log = []
+        committed = []
+        for (label, df), (load_success, load_msg) in zip(
+            (("naming keys", naming_df), ("campaign data", campaign_df)), load_results
+        ):
+            messages.append(load_msg)
+            if not load_success:
+                errors_count += 1
+            else:
+                committed.append((label, len(df)))
+                step_log.append(f"✅ {load_msg}")
+        if step_log:
+            st.markdown("  \n".join(step_log))
+
+        if errors_count:
+            if committed:
+                # One table was committed while the other failed: record the partial load
+                partial_msg = (
+                    f"⚠️ Partial load: only the {committed[0][0]} table was committed "
+                    f"for wave {wave_number}"
+                )
+                messages.append(partial_msg)
+                st.write(partial_msg)
+                insert_processing_log(
+                    schema_name, wave_number, 'FAILED', sum(rows for _, rows in committed),
+                    errors_count, warnings_count, time.time() - start_time,
+                    client_name, platform, year, conn
+                )
             return False, messages
 
-        st.write(f"✅ {campaign_msg}")
-
         # Step 5: Create AUDIENCE_AD_DESCRIPTOR_DATA view
         st.write("Creating AUDIENCE_AD_DESCRIPTOR_DATA view...")
         view_success, view_msg = create_audience_ad_descriptor_view(schema_name, platform, conn)
@@ -159,29 +195,56 @@ def upload_to_snowflake(conn, campaign_df, naming_df, schema_name, wave_number,
         st.error(error_msg)
         return False, messages
 
-def process_uploaded_files(campaign_file, naming_file, wave_number, client_name, platform, project_year):
-    """Process uploaded files and return result."""
+def spool_upload_to_temp(uploaded_file):
+    """Stream an uploaded file to a temporary CSV on disk and return its path."""
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
+        shutil.copyfileobj(uploaded_file, tmp_file, length=constants.COPY_CHUNK_SIZE_BYTES)
+    # Leave the upload rewound for the later stage upload
+    uploaded_file.seek(0)
+    return tmp_file.name
+
+
+# Bytes from the start of an upload used for (and hashed into the cache key of) the preview
+PREVIEW_HEAD_BYTES = 64 * 1024
+
+
+@st.cache_data(show_spinner=False)
+def _preview_csv(name, size, head_bytes):
+    """Parse the first rows of an upload; cached on file name, size and leading bytes."""
+    return pd.read_csv(io.BytesIO(head_bytes), nrows=3, dtype=str, engine='c')
+
+
+def preview_uploaded_csv(uploaded_file):
+    """Return a 3-row preview of an uploaded CSV, reusing the cached parse on reruns."""
+    uploaded_file.seek(0)
+    head_bytes = uploaded_file.read(PREVIEW_HEAD_BYTES)
+    uploaded_file.seek(0)
+    return _preview_csv(uploaded_file.name, uploaded_file.size, head_bytes)
+
+
+def count_csv_rows(path):
+    """Count data rows in a CSV (lines minus header) without parsing it."""
+    line_count = 0
+    last_chunk = b""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(constants.COPY_CHUNK_SIZE_BYTES), b""):
+            line_count += chunk.count(b"\n")
+            last_chunk = chunk
+    # A final line without a trailing newline still counts
+    if last_chunk and not last_chunk.endswith(b"\n"):
+        line_count += 1
+    return max(line_count - 1, 0)
+
+
+def process_uploaded_files(campaign_path, naming_path, wave_number, client_name, platform, project_year):
+    """Process spooled upload files and return result."""
     try:
-        # Save uploaded files temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_campaign:
-            tmp_campaign.write(campaign_file.getvalue())
-            campaign_path = tmp_campaign.name
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_naming:
-            tmp_naming.write(naming_file.getvalue())
-            naming_path = tmp_naming.name
-        
         # Initialize processor
         processor = CampaignDataProcessor()
         
         # Process files
-        result = processor.process_files(campaign_path, naming_path, wave_number, client_name, platform, project_year)
-        
-        # Clean up temporary files
-        os.unlink(campaign_path)
-        os.unlink(naming_path)
-        
-        return result
+        return processor.process_files(campaign_path, naming_path, wave_number, client_name, platform, project_year)
         
     except Exception as e:
         return {'success': False, 'errors': [str(e)]}
@@ -247,6 +310,8 @@ def main():
             # Processing steps with logging
             st.header("📊 Processing Steps")
 
+            from snowflake_operations import rename_uploaded_file
+
             # Step 1: File renaming
             with st.status("Step 1: Renaming files...", expanded=True) as status:
                 st.write("Standardizing file names...")
@@ -264,51 +329,64 @@ def main():
 
                 status.update(label="Step 1: File renaming completed", state="complete")
 
-            # Step 2: File validation and preview
-            with st.status("Step 2: Validating files...", expanded=True) as status:
-                st.write("✅ Campaign file uploaded")
-                st.write("✅ Naming key file uploaded")
-
-                # Preview data
-                st.write("📊 **Data Preview:**")
-
-                # Campaign data preview
-                try:
-                    campaign_df = pd.read_csv(campaign_file)
-                    st.write(f"**Campaign Data:** {len(campaign_df)} rows, {len(campaign_df.columns)} columns")
-                    st.dataframe(campaign_df.head(3), use_container_width=True)
-                except Exception as e:
-                    st.write(f"❌ Error reading campaign file: {str(e)}")
-
-                # Naming data preview
-                try:
-                    naming_df = pd.read_csv(naming_file)
-                    st.write(f"**Naming Data:** {len(naming_df)} rows, {len(naming_df.columns)} columns")
-                    st.dataframe(naming_df.head(3), use_container_width=True)
-                except Exception as e:
-                    st.write(f"❌ Error reading naming file: {str(e)}")
-
-                status.update(label="Step 2: File validation completed", state="complete")
-
-            # Step 3: Data processing
-            with st.status("Step 3: Processing data...", expanded=True) as status:
-                try:
-                    result = process_uploaded_files(campaign_file, naming_file, wave_number, client_name, platform, project_year)
-
-                    if result['success']:
-                        st.write("✅ Data validation completed")
-                        st.write(f"✅ Processed {len(result.get('campaign_data', []))} campaign records")
-                        st.write(f"✅ Processed {len(result.get('naming_data', []))} naming records")
-                        status.update(label="Step 3: Data processing completed", state="complete")
-                    else:
-                        st.write("❌ Data processing failed")
-                        for error in result.get('errors', []):
-                            st.write(f"❌ {error}")
-                        status.update(label="Step 3: Data processing failed", state="error")
-
-                except Exception as e:
-                    st.write(f"❌ Unexpected error: {str(e)}")
-                    status.update(label="Step 3: Processing failed", state="error")
+            # Spool both uploads to disk once; preview and processing read the same files
+            campaign_path = spool_upload_to_temp(campaign_file)
+            naming_path = spool_upload_to_temp(naming_file)
+            result = {'success': False}
+
+            try:
+                # Step 2: File validation and preview
+                with st.status("Step 2: Validating files...", expanded=True) as status:
+                    st.write("✅ Campaign file uploaded")
+                    st.write("✅ Naming key file uploaded")
+
+                    # Preview data
+                    st.write("📊 **Data Preview:**")
+
+                    # Campaign data preview
+                    try:
+                        # Parse only the header and first rows (cached); count lines without parsing
+                        campaign_preview = preview_uploaded_csv(campaign_file)
+                        st.write(f"**Campaign Data:** {count_csv_rows(campaign_path)} rows, {len(campaign_preview.columns)} columns")
+                        st.dataframe(campaign_preview, use_container_width=True)
+                    except Exception as e:
+                        st.write(f"❌ Error reading campaign file: {str(e)}")
+
+                    # Naming data preview
+                    try:
+                        # Parse only the header and first rows (cached); count lines without parsing
+                        naming_preview = preview_uploaded_csv(naming_file)
+                        st.write(f"**Naming Data:** {count_csv_rows(naming_path)} rows, {len(naming_preview.columns)} columns")
+                        st.dataframe(naming_preview, use_container_width=True)
+                    except Exception as e:
+                        st.write(f"❌ Error reading naming file: {str(e)}")
+
+                    status.update(label="Step 2: File validation completed", state="complete")
+
+                # Step 3: Data processing
+                with st.status("Step 3: Processing data...", expanded=True) as status:
+                    try:
+                        result = process_uploaded_files(campaign_path, naming_path, wave_number, client_name, platform, project_year)
+
+                        if result['success']:
+                            st.write("✅ Data validation completed")
+                            st.write(f"✅ Processed {len(result.get('campaign_data', []))} campaign records")
+                            st.write(f"✅ Processed {len(result.get('naming_data', []))} naming records")
+                            status.update(label="Step 3: Data processing completed", state="complete")
+                        else:
+                            st.write("❌ Data processing failed")
+                            for error in result.get('errors', []):
+                                st.write(f"❌ {error}")
+                            status.update(label="Step 3: Data processing failed", state="error")
+
+                    except Exception as e:
+                        st.write(f"❌ Unexpected error: {str(e)}")
+                        status.update(label="Step 3: Processing failed", state="error")
+            finally:
+                # Clean up temporary files, even if preview or processing raised
+                for tmp_path in (campaign_path, naming_path):
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
 
             # Step 4: Upload to Snowflake (only if Step 3 succeeded)
             if result.get('success', False):
@@ -316,36 +394,36 @@ def main():
                 overall_success = True
 
                 with st.status("Step 4: Uploading to Snowflake...", expanded=True) as upload_status:
-                    # Get Snowflake connection
-                    conn = get_snowflake_connection()
-
-                    if conn:
-                        st.write("✅ Snowflake connection established")
-
-                        upload_success, upload_messages = upload_to_snowflake(
-                            conn,
-                            result['campaign_data'],
-                            result['naming_data'],
-                            result['schema_name'],
-                            wave_number, client_name, platform, project_year,
-                            start_time,
-                            campaign_file,
-                            naming_file
-                        )
-
-                        if upload_success:
-                            st.write("✅ Data uploaded to Snowflake successfully")
-                            upload_status.update(label="Step 4: Snowflake upload completed", state="complete")
+                    # Get Snowflake connection, leased so the session pool can't close it mid-upload
+                    from snowflake_operations import leased_snowflake_connection
+                    with leased_snowflake_connection() as conn:
+                        if conn:
+                            st.write("✅ Snowflake connection established")
+
+                            upload_success, upload_messages = upload_to_snowflake(
+                                conn,
+                                result['campaign_data'],
+                                result['naming_data'],
+                                result['schema_name'],
+                                wave_number, client_name, platform, project_year,
+                                start_time,
+                                campaign_file,
+                                naming_file
+                            )
+
+                            if upload_success:
+                                st.write("✅ Data uploaded to Snowflake successfully")
+                                upload_status.update(label="Step 4: Snowflake upload completed", state="complete")
+                            else:
+                                st.write("❌ Snowflake upload failed")
+                                for msg in upload_messages:
+                                    st.write(f"❌ {msg}")
+                                upload_status.update(label="Step 4: Snowflake upload failed", state="error")
+                                overall_success = False
                         else:
-                            st.write("❌ Snowflake upload failed")
-                            for msg in upload_messages:
-                                st.write(f"❌ {msg}")
-                            upload_status.update(label="Step 4: Snowflake upload failed", state="error")
-                            overall_success = False
-                    else:
-                        st.write("⚠️ No Snowflake connection available - running in local mode")
-                        st.write("💡 Files have been processed and validated locally")
-                        upload_status.update(label="Step 4: Skipped (local mode)", state="complete")
+                            st.write("⚠️ No Snowflake connection available - running in local mode")
+                            st.write("💡 Files have been processed and validated locally")
+                            upload_status.update(label="Step 4: Skipped (local mode)", state="complete")
 
                 # Step 5: Finalize only if overall success
                 if overall_success:
@@ -4,13 +4,30 @@ Utility functions for campaign data preprocessing and validation.
 
 import pandas as pd
 import re
+import string
+import functools
 from typing import Tuple, List, Dict
 import logging
+import constants
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point (streamlit_app.py)
 logger = logging.getLogger(__name__)
 
+# Patterns used by column normalization, compiled once at import
+_STRIP_RE = re.compile(r'[^a-zA-Z0-9 ]')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+# ASCII fast path: one translate call drops symbols and turns spaces into underscores
+_ALLOWED_COLUMN_CHARS = frozenset(string.ascii_letters + string.digits + ' ')
+_ASCII_NORMALIZE_TABLE = {c: None for c in range(128) if chr(c) not in _ALLOWED_COLUMN_CHARS}
+_ASCII_NORMALIZE_TABLE[ord(' ')] = '_'
+
+# Frames larger than this skip the row-hashing duplicate count in the quality report
+DUPLICATE_CHECK_MAX_ROWS = 1_000_000
+
+# At least one of these must be present in campaign data
+_CRITICAL_CAMPAIGN_COLUMN_SET = frozenset(constants.CRITICAL_CAMPAIGN_COLUMNS)
+
 
 def normalize_column_name(col_name: str) -> str:
     """
@@ -22,14 +39,35 @@ def normalize_column_name(col_name: str) -> str:
     Returns:
         Normalized column name
     """
-    if pd.isna(col_name):
-        return ''
+    if not isinstance(col_name, str):
+        # None/NaN are checked directly instead of through pd.isna; NaN never equals
+        # itself, so it is handled here rather than in the cache
+        if col_name is None or (isinstance(col_name, float) and col_name != col_name):
+            return ''
+        col_name = str(col_name)
+    return _normalize_column_name_cached(col_name)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_column_name_cached(col_name: str) -> str:
+    """
+    Normalize a string column name.
+    Results are cached since the same headers recur across files and waves.
     
+    Args:
+        col_name: Original column name
+        
+    Returns:
+        Normalized column name
+    """
     # Replace spaces with underscores, remove other symbols, keep only letters/numbers/underscores, make lowercase
-    normalized = re.sub(r'[^a-zA-Z0-9 ]', '', str(col_name).strip())
-    normalized = normalized.replace(' ', '_').lower()
+    if col_name.isascii():
+        normalized = col_name.strip().translate(_ASCII_NORMALIZE_TABLE).lower()
+    else:
+        normalized = _STRIP_RE.sub('', col_name.strip())
+        normalized = normalized.replace(' ', '_').lower()
     # Remove multiple consecutive underscores
-    normalized = re.sub(r'_+', '_', normalized)
+    normalized = _UNDERSCORES_RE.sub('_', normalized)
     # Remove leading/trailing underscores
     normalized = normalized.strip('_')
     return normalized
@@ -53,45 +91,15 @@ def validate_campaign_data(df: pd.DataFrame) -> Tuple[bool, List[str], List[str]
         errors.append("Campaign data file is empty")
         return False, errors, warnings
 
-    # Get normalized column names
-    normalized_columns = [normalize_column_name(col) for col in df.columns]
-
-    # All expected columns for campaign data (from data_access.py expected_campaign_columns)
-    expected_columns = [
-        'campaign_name', 'ad_name', 'ad_set_name', 'ad_delivery',
-        'starts', 'ends', 'reporting_starts', 'reporting_ends', 'last_significant_edit',
-        'wave_number', 'attribution_setting',
-        'amount_spent_usd', 'ad_set_budget', 'ad_set_budget_type',
-        'bid', 'bid_type', 'cpm_usd',
-        'results', 'result_indicator', 'cost_per_result',
-        'frequency', 'reach', 'impressions',
-        'unique_link_clicks', 'landing_page_views', 'email_signups',
-        'kpv_community', 'kpv_tool', 'kpv_transformation', 'kpv_support',
-        'kpv_nohero', 'kpv_inspiration', 'kpv_authentic', 'kpv_nextlevel',
-        'kpv_nextchapter', 'kpv_workshop', 'kpv_openhouse',
-        'lead_openhouse', 'lead_workshop', 'lead_info',
-        'click_findout', 'click_letschat', 'click_openhouse',
-        'click_workshop', 'click_info',
-        'adds_to_cart', 'in_app_adds_to_cart', 'website_adds_to_cart',
-        'offline_adds_to_cart', 'meta_add_to_cart',
-        'checkouts_initiated', 'in_app_checkouts', 'website_checkouts',
-        'offline_checkouts', 'meta_checkouts',
-        'purchases', 'in_app_purchases', 'website_purchases',
-        'offline_purchases', 'meta_purchases',
-        'registrations_completed', 'in_app_registrations',
-        'website_registrations', 'offline_registrations',
-        'instagram_profile_visits', 'post_comments', 'post_reactions',
-        'post_saves', 'post_shares', 'post_engagements',
-        'video_avg_play_time'
-    ]
+    # Get normalized column names (as a set for membership checks)
+    normalized_set = {normalize_column_name(col) for col in df.columns}
 
     # Check for critical required columns (must have at least one of ad_name or ad_set_name)
-    critical_columns = ['ad_name', 'ad_set_name']
     missing_critical = []
 
     # Check if we have at least one of the critical columns
-    has_ad_name = 'ad_name' in normalized_columns
-    has_ad_set_name = 'ad_set_name' in normalized_columns
+    has_ad_name = 'ad_name' in normalized_set
+    has_ad_set_name = 'ad_set_name' in normalized_set
     
     if not has_ad_name and not has_ad_set_name:
         missing_critical = ['ad_name', 'ad_set_name']
@@ -102,12 +110,11 @@ def validate_campaign_data(df: pd.DataFrame) -> Tuple[bool, List[str], List[str]
         warnings.append("ad_set_name column missing - will use ad_name as fallback")
 
     # Check for missing optional columns - warn only
-    missing_optional = []
-    for exp_col in expected_columns:
-        if exp_col not in normalized_columns and exp_col not in critical_columns:
-            missing_optional.append(exp_col)
+    # Set difference first; the ordered list is only built when something is missing
+    missing = constants.EXPECTED_CAMPAIGN_COLUMN_SET - normalized_set - _CRITICAL_CAMPAIGN_COLUMN_SET
 
-    if missing_optional:
+    if missing:
+        missing_optional = [col for col in constants.EXPECTED_CAMPAIGN_COLUMNS if col in missing]
         warnings.append(f"Missing optional campaign columns (will be filled with NULL): {', '.join(missing_optional[:10])}" +
                        (f" and {len(missing_optional) - 10} more" if len(missing_optional) > 10 else ""))
 
@@ -115,10 +122,11 @@ def validate_campaign_data(df: pd.DataFrame) -> Tuple[bool, List[str], List[str]
     type_errors = []
     numeric_cols_to_check = ['Impressions', 'Results', 'Reach']
     for col in numeric_cols_to_check:
-        if col in df.columns:
-            try:
-                pd.to_numeric(df[col], errors='coerce')
-            except:
+        # Columns pandas already parsed as numeric need no coercion
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            # errors='coerce' never raises, so flag columns where nothing converts
+            coerced = pd.to_numeric(df[col], errors='coerce')
+            if coerced.isna().all() and df[col].notna().any():
                 type_errors.append(f"Cannot convert {col} to numeric")
 
     if type_errors:
@@ -145,62 +153,70 @@ def validate_naming_data(df: pd.DataFrame) -> Tuple[bool, List[str], List[str]]:
         errors.append("Naming key file is empty")
         return False, errors, warnings
 
-    # All expected naming key columns (from data_access.py expected_naming_columns)
-    expected_naming_columns = [
-        'ad_set_name',
-        'audience',
-        'concept',
-        'position',
-        'ad_descriptor',
-        'ad_direction',
-        'landing_page'
-    ]
-
-    # Check for normalized columns
-    normalized_columns = [normalize_column_name(col) for col in df.columns]
+    # Check for normalized columns (as a set for membership checks)
+    normalized_set = {normalize_column_name(col) for col in df.columns}
 
     # Check for critical required column (primary key)
-    if 'ad_set_name' not in normalized_columns:
+    if 'ad_set_name' not in normalized_set:
         errors.append("Missing critical column: 'ad_set_name' (required as primary key)")
 
     # Check for missing optional columns - warn only
-    missing_optional = []
-    for exp_col in expected_naming_columns:
-        if exp_col not in normalized_columns and exp_col != 'ad_set_name':
-            missing_optional.append(exp_col)
+    missing = constants.EXPECTED_NAMING_COLUMN_SET - normalized_set - {'ad_set_name'}
 
-    if missing_optional:
+    if missing:
+        missing_optional = [col for col in constants.EXPECTED_NAMING_COLUMNS if col in missing]
         warnings.append(f"Missing optional naming columns (will be filled with NULL): {', '.join(missing_optional)}")
 
     return len(errors) == 0, errors, warnings
 
 
-def generate_data_quality_report(campaign_df: pd.DataFrame, naming_df: pd.DataFrame) -> Dict:
+def _frame_quality(df: pd.DataFrame, include_duplicates: bool) -> Dict:
+    """
+    Summarize one DataFrame for the data quality report.
+    
+    Args:
+        df: DataFrame to summarize
+        include_duplicates: Whether to count duplicate rows
+        
+    Returns:
+        Quality summary dictionary
+    """
+    duplicate_rows = None
+    if include_duplicates:
+        if len(df) > DUPLICATE_CHECK_MAX_ROWS:
+            logger.warning(
+                f"Skipping duplicate row count for {len(df)} rows (limit {DUPLICATE_CHECK_MAX_ROWS})"
+            )
+        else:
+            duplicate_rows = int(df.duplicated().sum())
+
+    null_counts = df.isna().sum()
+    return {
+        'total_rows': len(df),
+        'total_columns': len(df.columns),
+        'missing_values': {col: int(count) for col, count in null_counts.items()},
+        'duplicate_rows': duplicate_rows,
+        'data_types': df.dtypes.to_dict()
+    }
+
+
+def generate_data_quality_report(
+    campaign_df: pd.DataFrame,
+    naming_df: pd.DataFrame,
+    include_duplicates: bool = True
+) -> Dict:
     """
     Generate data quality report.
     
     Args:
         campaign_df: Processed campaign DataFrame
         naming_df: Processed naming DataFrame
+        include_duplicates: Whether to count duplicate rows (skipped above DUPLICATE_CHECK_MAX_ROWS)
         
     Returns:
         Data quality report dictionary
     """
-    report = {
-        'campaign_data': {
-            'total_rows': len(campaign_df),
-            'total_columns': len(campaign_df.columns),
-            'missing_values': campaign_df.isnull().sum().to_dict(),
-            'duplicate_rows': campaign_df.duplicated().sum(),
-            'data_types': campaign_df.dtypes.to_dict()
-        },
-        'naming_data': {
-            'total_rows': len(naming_df),
-            'total_columns': len(naming_df.columns),
-            'missing_values': naming_df.isnull().sum().to_dict(),
-            'duplicate_rows': naming_df.duplicated().sum(),
-            'data_types': naming_df.dtypes.to_dict()
-        }
+    return {
+        'campaign_data': _frame_quality(campaign_df, include_duplicates),
+        'naming_data': _frame_quality(naming_df, include_duplicates)
     }
-    
-    return report
@@ -0,0 +1,74 @@
+"""
+Shared fixtures for Snowflake tests.
+
+Prerequisites:
+- Set up .env file with Snowflake credentials or configure Streamlit secrets
+- Requires SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, SNOWFLAKE_PASSWORD, SNOWFLAKE_WAREHOUSE, SNOWFLAKE_DATABASE
+"""
+
+import pytest
+import sys
+import uuid
+import logging
+from pathlib import Path
+
+# Configure logging for tests
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(name)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent.parent / 'src'
+sys.path.insert(0, str(src_path))
+
+# Also add streamlit directory so modules can find each other
+streamlit_path = src_path / 'project_spark' / 'streamlit'
+sys.path.insert(0, str(streamlit_path))
+
+from project_spark.streamlit.snowflake_operations import close_snowflake_connection, get_snowflake_connection
+
+
+@pytest.fixture(scope="session")
+def snowflake_session():
+    """Get one real Snowflake session shared by every test module (one login per run)"""
+    logger.info("Attempting to connect to Snowflake...")
+    session = get_snowflake_connection()
+    if session is None:
+        logger.error("Failed to connect to Snowflake!")
+        logger.error("Check your .env file for: SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, SNOWFLAKE_PASSWORD, SNOWFLAKE_WAREHOUSE, SNOWFLAKE_DATABASE")
+        pytest.skip("Snowflake connection not available. Set up .env or Streamlit secrets.")
+    logger.info("Successfully connected to Snowflake!")
+    yield session
+    # Close through the pool so it doesn't keep handing out the closed session
+    close_snowflake_connection()
+    logger.info("Connection closed successfully")
+
+
+@pytest.fixture(scope="session")
+def test_database(snowflake_session):
+    """Create one test database per pytest run and cleanup after all tests"""
+    # Random suffix so concurrent runs (CI jobs, pytest-xdist workers) never share or drop
+    # each other's database, and a new run can't reuse one whose drop is still in flight
+    test_db_name = f"TEST_DELTA_LOAD_{uuid.uuid4().hex[:8].upper()}"
+
+    try:
+        # Create test database (transient, no time travel: it only holds throwaway data)
+        # and switch to it in one multi-statement round trip
+        logger.info("Creating test database: %s", test_db_name)
+        snowflake_session.sql(
+            f"CREATE TRANSIENT DATABASE {test_db_name} DATA_RETENTION_TIME_IN_DAYS = 0;\n"
+            f"USE DATABASE {test_db_name}"
+        ).collect(statement_params={"MULTI_STATEMENT_COUNT": 0})
+        logger.info("Using test database: %s", test_db_name)
+
+        yield test_db_name
+
+    finally:
+        # Cleanup: Drop test database after all tests. Kept synchronous on purpose: the drop
+        # is metadata-only, and each run uses a random name, so a drop that failed unnoticed
+        # would leak the database
+        try:
+            logger.info("Cleaning up test database: %s", test_db_name)
+            snowflake_session.sql(f"DROP DATABASE IF EXISTS {test_db_name} CASCADE").collect()
+            logger.info("Dropped test database %s", test_db_name)
+        except Exception as e:
+            logger.warning("Failed to drop test database %s, drop it manually: %s", test_db_name, e)
@@ -9,68 +9,16 @@ Prerequisites:
 
 import pytest
 import pandas as pd
-import sys
 import logging
-from pathlib import Path
-
-# Configure logging for tests
-logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(name)s - %(message)s')
-logger = logging.getLogger(__name__)
-
-# Add src to path for imports
-src_path = Path(__file__).parent.parent.parent / 'src'
-sys.path.insert(0, str(src_path))
-
-# Also add streamlit directory so modules can find each other
-streamlit_path = src_path / 'project_spark' / 'streamlit'
-sys.path.insert(0, str(streamlit_path))
 
+# src paths and the shared snowflake_session / test_database fixtures are set up in conftest.py
 from project_spark.streamlit.snowflake_operations import (
     populate_campaign_data_table,
     populate_naming_keys_table,
-    create_schema_and_tables,
-    get_snowflake_connection
+    create_schema_and_tables
 )
 
-
-@pytest.fixture(scope="module")
-def snowflake_session():
-    """Get real Snowflake session for integration tests"""
-    logger.info("Attempting to connect to Snowflake...")
-    session = get_snowflake_connection()
-    if session is None:
-        logger.error("Failed to connect to Snowflake!")
-        logger.error("Check your .env file for: SNOWFLAKE_ACCOUNT, SNOWFLAKE_USER, SNOWFLAKE_PASSWORD, SNOWFLAKE_WAREHOUSE, SNOWFLAKE_DATABASE")
-        pytest.skip("Snowflake connection not available. Set up .env or Streamlit secrets.")
-    logger.info("Successfully connected to Snowflake!")
-    yield session
-    session.close()
-
-
-@pytest.fixture(scope="module")
-def test_database(snowflake_session):
-    """Create test database and cleanup after all tests"""
-    test_db_name = "TEST_DELTA_LOAD_DB"
-
-    try:
-        # Create test database
-        logger.info(f"Creating test database: {test_db_name}")
-        snowflake_session.sql(f"CREATE DATABASE IF NOT EXISTS {test_db_name}").collect()
-
-        # Switch to test database
-        snowflake_session.sql(f"USE DATABASE {test_db_name}").collect()
-        logger.info(f"Using test database: {test_db_name}")
-
-        yield test_db_name
-
-    finally:
-        # Cleanup: Drop test database after all tests
-        try:
-            logger.info(f"Cleaning up test database: {test_db_name}")
-            snowflake_session.sql(f"DROP DATABASE IF EXISTS {test_db_name} CASCADE").collect()
-            logger.info(f"Test database {test_db_name} dropped successfully")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup test database: {e}")
+logger = logging.getLogger(__name__)
 
 
 @pytest.fixture(scope="module")
@@ -81,8 +29,9 @@ def test_schema(snowflake_session, test_database):
     test_year = 2024
 
     # Create schema and tables
+    # Transient: test data needs no fail-safe or time travel
     success, schema_name, message = create_schema_and_tables(
-        test_client, test_platform, test_year, snowflake_session
+        test_client, test_platform, test_year, snowflake_session, transient=True
     )
 
     if not success:
@@ -141,13 +90,14 @@ class TestDeltaLoadCampaignDataIntegration:
         logger.info("=" * 80)
         assert len(result1) == 1, "Should have 1 record for DeltaTest_Ad1"
         row1 = result1[0]
-        logger.info(f"ad_name: {row1['AD_NAME']}")
-        logger.info(f"campaign_name: {row1['CAMPAIGN_NAME']}")
-        logger.info(f"amount_spent_usd: {float(row1['AMOUNT_SPENT_USD'])}")
-        logger.info(f"impressions: {int(row1['IMPRESSIONS'])}")
-        logger.info(f"reach: {int(row1['REACH'])}")
-        logger.info(f"wave_number: {int(row1['WAVE_NUMBER'])}")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("ad_name: %s", row1['AD_NAME'])
+            logger.info("campaign_name: %s", row1['CAMPAIGN_NAME'])
+            logger.info("amount_spent_usd: %s", row1['AMOUNT_SPENT_USD'])
+            logger.info("impressions: %s", row1['IMPRESSIONS'])
+            logger.info("reach: %s", row1['REACH'])
+            logger.info("wave_number: %s", row1['WAVE_NUMBER'])
+            logger.info("=" * 80)
 
         assert row1['CAMPAIGN_NAME'] == 'Campaign_Initial'
         assert float(row1['AMOUNT_SPENT_USD']) == 100.0
@@ -172,30 +122,36 @@ class TestDeltaLoadCampaignDataIntegration:
         assert success2 is True, f"Delta load (update) failed: {message2}"
 
         # STEP 4: Verify that old values were REPLACED by new values (not added as new row)
+        # One query covers both ads; rows are grouped by ad_name client-side
         query2 = f"""
             SELECT ad_name, campaign_name, amount_spent_usd, impressions, reach, wave_number
             FROM {table_name}
-            WHERE ad_name = 'DeltaTest_Ad1'
+            WHERE ad_name IN ('DeltaTest_Ad1', 'DeltaTest_Ad2')
             ORDER BY wave_number DESC
         """
-        result2 = snowflake_session.sql(query2).collect()
-
-        logger.info("")
-        logger.info("=" * 80)
-        logger.info("AFTER DELTA LOAD - Updated Data (Wave 2)")
-        logger.info("=" * 80)
+        rows_by_ad = {}
+        for row in snowflake_session.sql(query2).collect():
+            rows_by_ad.setdefault(row['AD_NAME'], []).append(row)
+        result2 = rows_by_ad.get('DeltaTest_Ad1', [])
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("")
+            logger.info("=" * 80)
+            logger.info("AFTER DELTA LOAD - Updated Data (Wave 2)")
+            logger.info("=" * 80)
         # Critical assertion: Should still be only 1 row (updated, not inserted as new)
         assert len(result2) == 1, "Delta load should UPDATE existing row, not INSERT new row"
-        logger.info(f"Number of rows: {len(result2)} (should be 1 - proving UPDATE not INSERT)")
+        logger.info("Number of rows: %s (should be 1 - proving UPDATE not INSERT)", len(result2))
 
         row2 = result2[0]
-        logger.info(f"ad_name: {row2['AD_NAME']}")
-        logger.info(f"campaign_name: {row2['CAMPAIGN_NAME']} (was 'Campaign_Initial')")
-        logger.info(f"amount_spent_usd: {float(row2['AMOUNT_SPENT_USD'])} (was 100.0)")
-        logger.info(f"impressions: {int(row2['IMPRESSIONS'])} (was 1000)")
-        logger.info(f"reach: {int(row2['REACH'])} (was 500)")
-        logger.info(f"wave_number: {int(row2['WAVE_NUMBER'])} (was 1)")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("ad_name: %s", row2['AD_NAME'])
+            logger.info("campaign_name: %s (was 'Campaign_Initial')", row2['CAMPAIGN_NAME'])
+            logger.info("amount_spent_usd: %s (was 100.0)", row2['AMOUNT_SPENT_USD'])
+            logger.info("impressions: %s (was 1000)", row2['IMPRESSIONS'])
+            logger.info("reach: %s (was 500)", row2['REACH'])
+            logger.info("wave_number: %s (was 1)", row2['WAVE_NUMBER'])
+            logger.info("=" * 80)
 
         # Verify new values have OVERRIDDEN old values
         assert row2['CAMPAIGN_NAME'] == 'Campaign_Updated', "Campaign name should be updated"
@@ -207,12 +163,7 @@ class TestDeltaLoadCampaignDataIntegration:
         logger.info("TEST PASSED: Delta load successfully UPDATED existing row instead of inserting duplicate!")
 
         # STEP 5: Verify second ad (DeltaTest_Ad2) remains unchanged
-        query3 = f"""
-            SELECT ad_name, campaign_name, amount_spent_usd
-            FROM {table_name}
-            WHERE ad_name = 'DeltaTest_Ad2'
-        """
-        result3 = snowflake_session.sql(query3).collect()
+        result3 = rows_by_ad.get('DeltaTest_Ad2', [])
 
         assert len(result3) == 1, "Second ad should remain in database"
         assert result3[0]['CAMPAIGN_NAME'] == 'Campaign_Initial2'
@@ -262,40 +213,33 @@ class TestDeltaLoadCampaignDataIntegration:
         assert success2 is True, f"Insert with new column failed: {message2}"
         logger.info("STEP 2: Data with new column inserted")
 
-        # STEP 3: Check if the new column exists in the schema
-        query_columns = f"""
-            SELECT COLUMN_NAME
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = '{schema_name}'
-            AND TABLE_NAME = '{platform.upper()}_PROCESSED_CAMPAIGN_DATA'
-            AND COLUMN_NAME = 'QUANTUM_ENGAGEMENT_COEFFICIENT'
-        """
-        result_columns = snowflake_session.sql(query_columns).collect()
+        # STEP 3: Check if the new column exists in the schema (DESC TABLE reads table metadata
+        # directly rather than scanning INFORMATION_SCHEMA)
+        table_columns = {
+            row['name'].upper() for row in snowflake_session.sql(f"DESC TABLE {table_name}").collect()
+        }
 
         logger.info("STEP 3: Checking if new column 'QUANTUM_ENGAGEMENT_COEFFICIENT' exists in schema")
-        assert len(result_columns) == 1, "New column 'QUANTUM_ENGAGEMENT_COEFFICIENT' should exist in schema"
-        assert result_columns[0]['COLUMN_NAME'] == 'QUANTUM_ENGAGEMENT_COEFFICIENT'
+        assert 'QUANTUM_ENGAGEMENT_COEFFICIENT' in table_columns, "New column 'QUANTUM_ENGAGEMENT_COEFFICIENT' should exist in schema"
         logger.info("SUCCESS: New column 'QUANTUM_ENGAGEMENT_COEFFICIENT' found in schema")
 
-        # STEP 4: Verify the data in the new column
+        # STEP 4: Verify the data in the new column (one query for the new and old rows)
         query_data = f"""
             SELECT ad_name, quantum_engagement_coefficient
             FROM {table_name}
-            WHERE ad_name = 'SchemaTest_Ad3'
+            WHERE ad_name IN ('SchemaTest_Ad3', 'SchemaTest_Ad1')
         """
-        result_data = snowflake_session.sql(query_data).collect()
+        rows_by_ad = {}
+        for row in snowflake_session.sql(query_data).collect():
+            rows_by_ad.setdefault(row['AD_NAME'], []).append(row)
+        result_data = rows_by_ad.get('SchemaTest_Ad3', [])
 
         assert len(result_data) == 1, "Should find the row with new column data"
         assert float(result_data[0]['QUANTUM_ENGAGEMENT_COEFFICIENT']) == 7.42, "New column should have correct value"
         logger.info("STEP 4: New column data verified successfully")
 
         # STEP 5: Verify old rows have NULL for the new column
-        query_old = f"""
-            SELECT ad_name, quantum_engagement_coefficient
-            FROM {table_name}
-            WHERE ad_name = 'SchemaTest_Ad1'
-        """
-        result_old = snowflake_session.sql(query_old).collect()
+        result_old = rows_by_ad.get('SchemaTest_Ad1', [])
 
         assert len(result_old) == 1, "Old row should still exist"
         assert result_old[0]['QUANTUM_ENGAGEMENT_COEFFICIENT'] is None, "Old rows should have NULL for new column"
@@ -342,12 +286,13 @@ class TestDeltaLoadNamingKeysIntegration:
         logger.info("=" * 80)
         assert len(result1) == 1
         row1 = result1[0]
-        logger.info(f"ad_set_name: {row1['AD_SET_NAME']}")
-        logger.info(f"audience: {row1['AUDIENCE']}")
-        logger.info(f"concept: {row1['CONCEPT']}")
-        logger.info(f"position: {row1['POSITION']}")
-        logger.info(f"wave_number: {row1['WAVE_NUMBER']}")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("ad_set_name: %s", row1['AD_SET_NAME'])
+            logger.info("audience: %s", row1['AUDIENCE'])
+            logger.info("concept: %s", row1['CONCEPT'])
+            logger.info("position: %s", row1['POSITION'])
+            logger.info("wave_number: %s", row1['WAVE_NUMBER'])
+            logger.info("=" * 80)
 
         assert row1['AUDIENCE'] == 'Audience_Original'
         assert row1['CONCEPT'] == 'Concept_A'
@@ -376,21 +321,23 @@ class TestDeltaLoadNamingKeysIntegration:
         """
         result2 = snowflake_session.sql(query2).collect()
 
-        logger.info("")
-        logger.info("=" * 80)
-        logger.info("AFTER DELTA LOAD - Updated Data (Wave 2)")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("")
+            logger.info("=" * 80)
+            logger.info("AFTER DELTA LOAD - Updated Data (Wave 2)")
+            logger.info("=" * 80)
         # Should be only 1 row (updated, not duplicated)
         assert len(result2) == 1, "Delta load should UPDATE, not INSERT duplicate"
-        logger.info(f"Number of rows: {len(result2)} (should be 1 - proving UPDATE not INSERT)")
+        logger.info("Number of rows: %s (should be 1 - proving UPDATE not INSERT)", len(result2))
 
         row2 = result2[0]
-        logger.info(f"ad_set_name: {row2['AD_SET_NAME']}")
-        logger.info(f"audience: {row2['AUDIENCE']} (was 'Audience_Original')")
-        logger.info(f"concept: {row2['CONCEPT']} (was 'Concept_A')")
-        logger.info(f"position: {row2['POSITION']} (was 'Top')")
-        logger.info(f"wave_number: {row2['WAVE_NUMBER']} (was 1)")
-        logger.info("=" * 80)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("ad_set_name: %s", row2['AD_SET_NAME'])
+            logger.info("audience: %s (was 'Audience_Original')", row2['AUDIENCE'])
+            logger.info("concept: %s (was 'Concept_A')", row2['CONCEPT'])
+            logger.info("position: %s (was 'Top')", row2['POSITION'])
+            logger.info("wave_number: %s (was 1)", row2['WAVE_NUMBER'])
+            logger.info("=" * 80)
 
         # Verify new values have OVERRIDDEN old values
         assert row2['AUDIENCE'] == 'Audience_UPDATED', "Audience should be updated"
@@ -442,40 +389,33 @@ class TestDeltaLoadNamingKeysIntegration:
         assert success2 is True, f"Insert with new column failed: {message2}"
         logger.info("STEP 2: Data with new column inserted")
 
-        # STEP 3: Check if the new column exists in the schema
-        query_columns = f"""
-            SELECT COLUMN_NAME
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = '{schema_name}'
-            AND TABLE_NAME = '{platform.upper()}_NAMING_KEYS'
-            AND COLUMN_NAME = 'NEURO_RESONANCE_INDEX'
-        """
-        result_columns = snowflake_session.sql(query_columns).collect()
+        # STEP 3: Check if the new column exists in the schema (DESC TABLE reads table metadata
+        # directly rather than scanning INFORMATION_SCHEMA)
+        table_columns = {
+            row['name'].upper() for row in snowflake_session.sql(f"DESC TABLE {table_name}").collect()
+        }
 
         logger.info("STEP 3: Checking if new column 'NEURO_RESONANCE_INDEX' exists in schema")
-        assert len(result_columns) == 1, "New column 'NEURO_RESONANCE_INDEX' should exist in schema"
-        assert result_columns[0]['COLUMN_NAME'] == 'NEURO_RESONANCE_INDEX'
+        assert 'NEURO_RESONANCE_INDEX' in table_columns, "New column 'NEURO_RESONANCE_INDEX' should exist in schema"
         logger.info("SUCCESS: New column 'NEURO_RESONANCE_INDEX' found in schema")
 
-        # STEP 4: Verify the data in the new column
+        # STEP 4: Verify the data in the new column (one query for the new and old rows)
         query_data = f"""
             SELECT ad_set_name, neuro_resonance_index
             FROM {table_name}
-            WHERE ad_set_name = 'SchemaTest_AdSet3'
+            WHERE ad_set_name IN ('SchemaTest_AdSet3', 'SchemaTest_AdSet1')
         """
-        result_data = snowflake_session.sql(query_data).collect()
+        rows_by_ad_set = {}
+        for row in snowflake_session.sql(query_data).collect():
+            rows_by_ad_set.setdefault(row['AD_SET_NAME'], []).append(row)
+        result_data = rows_by_ad_set.get('SchemaTest_AdSet3', [])
 
         assert len(result_data) == 1, "Should find the row with new column data"
         assert result_data[0]['NEURO_RESONANCE_INDEX'] == 'Alpha-Theta-9.3', "New column should have correct value"
         logger.info("STEP 4: New column data verified successfully")
 
         # STEP 5: Verify old rows have NULL for the new column
-        query_old = f"""
-            SELECT ad_set_name, neuro_resonance_index
-            FROM {table_name}
-            WHERE ad_set_name = 'SchemaTest_AdSet1'
-        """
-        result_old = snowflake_session.sql(query_old).collect()
+        result_old = rows_by_ad_set.get('SchemaTest_AdSet1', [])
 
         assert len(result_old) == 1, "Old row should still exist"
         assert result_old[0]['NEURO_RESONANCE_INDEX'] is None, "Old rows should have NULL for new column"